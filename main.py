@@ -1,17 +1,2054 @@
 import sys
-import uuid
+import time
+STARTUP_MARKS = [("start", time.perf_counter())]  # (step, time it finished) for --profile-startup
 import os
-from datetime import datetime
-import numpy as np
-import pandas as pd
+import argparse
+import importlib.util
+import bisect
+import csv
+import queue
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+# numpy, pandas, openpyxl and pyarrow are imported where they are used, so
+# they are only loaded once a dashboard, report or export needs them
+STARTUP_MARKS.append(("import standard library", time.perf_counter()))
 import mysql.connector
+STARTUP_MARKS.append(("import mysql.connector", time.perf_counter()))
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QLineEdit, QComboBox, QTableWidget,
                              QTableWidgetItem, QHeaderView, QFrame, QTextEdit,
                              QRadioButton, QFileDialog, QMessageBox, QDateEdit, QStackedWidget,
-                             QScrollArea, QDialog)
-from PyQt5.QtGui import QPixmap, QFont, QImage, QIcon
-from PyQt5.QtCore import Qt, QDate, QSize
+                             QScrollArea, QDialog, QProgressBar, QCompleter, QTableView, QGridLayout,
+                             QCheckBox, QSpinBox, QStyledItemDelegate, QStyle)
+from PyQt5.QtGui import QPixmap, QFont, QImage, QIcon, QPainter, QColor, QLinearGradient, QImageReader
+from PyQt5.QtCore import (Qt, QDate, QSize, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal,
+                          QAbstractListModel, QAbstractTableModel, QModelIndex, QEvent)
+STARTUP_MARKS.append(("import PyQt5", time.perf_counter()))
+STARTUP_BUDGET_MS = 1000  # from launch to an interactive login window
+
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "12345",
+    "database": "library_db",
+    "connection_timeout": 10,
+}
+DB_POOL_SIZE = 4
+DB_QUERY_TIMEOUT_MS = 30000  # applies to SELECTs; 0 disables it
+DB_PING_AFTER_IDLE = 30  # seconds a connection may sit idle before it is pinged on checkout
+NGRAM_TOKEN_SIZE = 2  # the server's ngram_token_size
+ER_FT_MATCHING_KEY_NOT_FOUND = 1191  # MATCH without a FULLTEXT index to serve it
+ER_SIGNAL_EXCEPTION = 1644  # SIGNAL raised inside one of our stored procedures
+ER_NO_SUCH_TABLE = 1146
+ER_UNKNOWN_SYSTEM_VARIABLE = 1193
+SCHEMA_LOCK_TIMEOUT = 60  # seconds a client waits while another one migrates the schema
+SEARCH_MAX_RESULTS = 1000  # ranked matches kept by the in-process search index
+SEARCH_DEBOUNCE_MS = 300  # typing pause before a search box queries the database
+SEARCH_CACHE_SIZE = 32  # search terms remembered per table
+SEARCH_CACHE_ROWS = 500  # matches fetched per search; smaller result sets are refined locally
+LOOKUP_BATCH_SIZE = 50  # rows a picker loads each time its list is scrolled to the end
+PAGE_SIZES = [10, 25, 50, 100, 500]  # rows per page offered by paginated tables
+SCROLL_CHUNK_ROWS = 100  # rows fetched at a time in scroll mode
+SCROLL_WINDOW_CHUNKS = 5  # chunks held in scroll mode; the farthest from view is dropped
+SCROLL_FETCH_MARGIN = 20  # rows from either end of the held rows at which the next chunk is fetched
+REPORT_CHUNK_ROWS = 1000  # rows read off a streamed report per round trip
+REPORT_PREVIEW_ROWS = 1000000  # rows shown on the report page; exports always get every row
+XLSX_MAX_ROWS = 1048576  # rows per Excel worksheet, header included
+REPORT_REFRESH_OVERLAP = 60  # seconds re-read behind the watermark, for writes that committed late
+REPORT_CACHE_SIZE = 4  # generated reports kept for repeat requests
+REPORT_CACHE_ROWS = 200000  # preview rows held across all cached reports; larger ones are not kept
+LOAN_PERIOD_DAYS = 14  # a loan is due this many days after it is issued
+FINE_PER_DAY = Decimal("0.50")  # charged per day a book is kept past its due date
+OVERDUE_JOB_INTERVAL_MS = 60 * 60 * 1000  # how often fines are reassessed while the app runs
+ANALYTICS_CHUNK_ROWS = 50000  # rows per round trip when loading history for the dashboard
+ANALYTICS_TOP_N = 5  # entries in each dashboard top list
+# (upper bound in days, exclusive; label) of the loan duration buckets
+LOAN_DURATION_BUCKETS = [(8, "up to a week"), (15, "1-2 weeks"), (31, "2-4 weeks"), (61, "1-2 months"),
+                         (float("inf"), "longer")]
+
+# (table, index name, columns) of the ngram FULLTEXT indexes behind the search boxes
+SEARCH_INDEXES = [
+    ("users", "ft_users_search", "name, serial_number"),
+    ("books", "ft_books_title", "title"),
+    ("authors", "ft_authors_name", "name"),
+]
+
+def index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, index))
+    return cursor.fetchone() is not None
+
+def add_search_indexes(cursor):
+    # Servers without the ngram parser (MariaDB, MySQL before 5.7.6) keep
+    # working without these; TextSearch then falls back to a TrigramIndex.
+    # Each index is tried on its own, so one failure leaves the others.
+    for table, index, columns in SEARCH_INDEXES:
+        if not index_exists(cursor, table, index):
+            try:
+                cursor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX {index} ({columns}) WITH PARSER ngram")
+            except mysql.connector.Error:
+                continue
+
+# Schema history, applied in order by provision_schema and recorded in
+# schema_migrations. Never edit a migration once released; append a new one.
+# Steps are SQL statements, or a function taking a cursor.
+MIGRATIONS = [
+    (1, "initial schema", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255),
+            serial_number VARCHAR(255) UNIQUE,
+            phone_number VARCHAR(20),
+            address TEXT,
+            password VARCHAR(255),
+            is_admin BOOLEAN DEFAULT FALSE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS authors (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) UNIQUE,
+            details TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS books (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            serial_number VARCHAR(255) UNIQUE,
+            title VARCHAR(255),
+            author_id INT,
+            location TEXT,
+            FOREIGN KEY (author_id) REFERENCES authors(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT,
+            book_id INT,
+            issue_date DATE,
+            return_date DATE,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (book_id) REFERENCES books(id)
+        )
+        """,
+    ]),
+    (2, "secondary indexes for lookups and open loans", [
+        "CREATE INDEX idx_users_name ON users (name)",
+        "CREATE INDEX idx_users_is_admin ON users (is_admin)",
+        "CREATE INDEX idx_books_title ON books (title)",
+        "CREATE INDEX idx_transactions_book_open ON transactions (book_id, return_date)",
+        "CREATE INDEX idx_transactions_user_open ON transactions (user_id, return_date)",
+        "CREATE INDEX idx_transactions_issue_date ON transactions (issue_date)",
+    ]),
+    (3, "ngram FULLTEXT search indexes", add_search_indexes),
+    (4, "current holder columns on books", [
+        """
+        ALTER TABLE books
+            ADD COLUMN current_user_id INT NULL,
+            ADD COLUMN current_issue_date DATE NULL,
+            ADD INDEX idx_books_current_user (current_user_id),
+            ADD CONSTRAINT fk_books_current_user FOREIGN KEY (current_user_id) REFERENCES users(id)
+        """,
+        # A copy issued twice by the old race has several open loans. Only the
+        # newest is kept open. The others are closed on their own issue date,
+        # so no overdue fine or loan time builds up on them.
+        """
+        UPDATE transactions t
+        JOIN transactions newer ON newer.book_id = t.book_id AND newer.return_date IS NULL AND newer.id > t.id
+        SET t.return_date = t.issue_date
+        WHERE t.return_date IS NULL
+        """,
+        """
+        UPDATE books b
+        JOIN transactions t ON t.book_id = b.id AND t.return_date IS NULL
+        SET b.current_user_id = t.user_id, b.current_issue_date = t.issue_date
+        """,
+    ]),
+    # Issue and return each run as one CALL: lookup, row lock, loan row and
+    # holder columns in a single round trip and a single transaction. Failures
+    # are raised with SIGNAL so the message reaches the desk as-is.
+    (5, "issue_book and return_book procedures", [
+        "DROP PROCEDURE IF EXISTS issue_book",
+        """
+        CREATE PROCEDURE issue_book(IN p_user_name VARCHAR(255), IN p_book_title VARCHAR(255),
+                                    IN p_issue_date DATE)
+        BEGIN
+            DECLARE v_user_id INT DEFAULT NULL;
+            DECLARE v_book_id INT DEFAULT NULL;
+            DECLARE EXIT HANDLER FOR SQLEXCEPTION
+            BEGIN
+                ROLLBACK;
+                RESIGNAL;
+            END;
+
+            START TRANSACTION;
+            SELECT id INTO v_user_id FROM users WHERE name = p_user_name ORDER BY id LIMIT 1;
+            IF v_user_id IS NULL THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'User not found';
+            END IF;
+
+            -- Locking the copy makes a second desk wait here, then see it is taken
+            SELECT id INTO v_book_id FROM books
+            WHERE title = p_book_title AND current_user_id IS NULL
+            ORDER BY id LIMIT 1 FOR UPDATE;
+            IF v_book_id IS NULL THEN
+                IF EXISTS (SELECT 1 FROM books WHERE title = p_book_title) THEN
+                    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Conflict: every copy of this book is already issued';
+                END IF;
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Book not found';
+            END IF;
+
+            INSERT INTO transactions (user_id, book_id, issue_date) VALUES (v_user_id, v_book_id, p_issue_date);
+            UPDATE books SET current_user_id = v_user_id, current_issue_date = p_issue_date WHERE id = v_book_id;
+            COMMIT;
+        END
+        """,
+        "DROP PROCEDURE IF EXISTS return_book",
+        """
+        CREATE PROCEDURE return_book(IN p_user_name VARCHAR(255), IN p_book_title VARCHAR(255),
+                                     IN p_return_date DATE)
+        BEGIN
+            DECLARE v_user_id INT DEFAULT NULL;
+            DECLARE v_book_id INT DEFAULT NULL;
+            DECLARE EXIT HANDLER FOR SQLEXCEPTION
+            BEGIN
+                ROLLBACK;
+                RESIGNAL;
+            END;
+
+            START TRANSACTION;
+            SELECT b.id, b.current_user_id INTO v_book_id, v_user_id
+            FROM books b JOIN users u ON u.id = b.current_user_id
+            WHERE u.name = p_user_name AND b.title = p_book_title
+            ORDER BY b.id LIMIT 1 FOR UPDATE;
+            IF v_book_id IS NULL THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'No active transaction found for this book and user';
+            END IF;
+
+            UPDATE transactions SET return_date = p_return_date
+            WHERE book_id = v_book_id AND user_id = v_user_id AND return_date IS NULL;
+            UPDATE books SET current_user_id = NULL, current_issue_date = NULL WHERE id = v_book_id;
+            COMMIT;
+        END
+        """,
+    ]),
+    (6, "key issue_book and return_book by user and book id", [
+        "DROP PROCEDURE IF EXISTS issue_book",
+        """
+        CREATE PROCEDURE issue_book(IN p_user_id INT, IN p_book_id INT, IN p_issue_date DATE)
+        BEGIN
+            DECLARE v_book_id INT DEFAULT NULL;
+            DECLARE v_holder_id INT DEFAULT NULL;
+            DECLARE EXIT HANDLER FOR SQLEXCEPTION
+            BEGIN
+                ROLLBACK;
+                RESIGNAL;
+            END;
+
+            START TRANSACTION;
+            IF NOT EXISTS (SELECT 1 FROM users WHERE id = p_user_id) THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'User not found';
+            END IF;
+
+            -- Locking the copy makes a second desk wait here, then see it is taken
+            SELECT id, current_user_id INTO v_book_id, v_holder_id FROM books WHERE id = p_book_id FOR UPDATE;
+            IF v_book_id IS NULL THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Book not found';
+            END IF;
+            IF v_holder_id IS NOT NULL THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Conflict: this copy is already issued';
+            END IF;
+
+            INSERT INTO transactions (user_id, book_id, issue_date) VALUES (p_user_id, p_book_id, p_issue_date);
+            UPDATE books SET current_user_id = p_user_id, current_issue_date = p_issue_date WHERE id = p_book_id;
+            COMMIT;
+        END
+        """,
+        "DROP PROCEDURE IF EXISTS return_book",
+        """
+        CREATE PROCEDURE return_book(IN p_user_id INT, IN p_book_id INT, IN p_return_date DATE)
+        BEGIN
+            DECLARE v_holder_id INT DEFAULT NULL;
+            DECLARE EXIT HANDLER FOR SQLEXCEPTION
+            BEGIN
+                ROLLBACK;
+                RESIGNAL;
+            END;
+
+            START TRANSACTION;
+            SELECT current_user_id INTO v_holder_id FROM books WHERE id = p_book_id FOR UPDATE;
+            IF v_holder_id IS NULL OR v_holder_id <> p_user_id THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'No active transaction found for this book and user';
+            END IF;
+
+            UPDATE transactions SET return_date = p_return_date
+            WHERE book_id = p_book_id AND user_id = p_user_id AND return_date IS NULL;
+            UPDATE books SET current_user_id = NULL, current_issue_date = NULL WHERE id = p_book_id;
+            COMMIT;
+        END
+        """,
+    ]),
+    # Reports read these precomputed tables; refresh_reporting() keeps them
+    # current from the rows whose updated_at moved past the watermark.
+    (7, "materialized reporting tables", [
+        """
+        ALTER TABLE transactions
+            ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            ADD INDEX idx_transactions_updated_at (updated_at)
+        """,
+        """
+        ALTER TABLE books
+            ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            ADD INDEX idx_books_updated_at (updated_at)
+        """,
+        """
+        ALTER TABLE users
+            ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            ADD INDEX idx_users_updated_at (updated_at)
+        """,
+        """
+        ALTER TABLE authors
+            ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            ADD INDEX idx_authors_updated_at (updated_at)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS report_loans (
+            transaction_id INT PRIMARY KEY,
+            book_id INT,
+            user_id INT,
+            serial_number VARCHAR(255),
+            title VARCHAR(255),
+            author VARCHAR(255),
+            user_name VARCHAR(255),
+            address TEXT,
+            book_location TEXT,
+            issue_date DATE,
+            return_date DATE,
+            INDEX idx_report_loans_title (title),
+            INDEX idx_report_loans_issue_date (issue_date),
+            INDEX idx_report_loans_open (return_date, issue_date),
+            INDEX idx_report_loans_book (book_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS report_refresh (
+            name VARCHAR(64) PRIMARY KEY,
+            refreshed_until DATETIME NOT NULL
+        )
+        """,
+        "INSERT INTO report_refresh (name, refreshed_until) VALUES ('reporting', '1970-01-01 00:00:00')",
+    ]),
+    # Every write to a source table bumps one counter, in the same transaction,
+    # so an unchanged counter proves a cached report is still current.
+    (8, "data version counter", [
+        "CREATE TABLE IF NOT EXISTS data_version (id TINYINT PRIMARY KEY, version BIGINT NOT NULL)",
+        "INSERT INTO data_version (id, version) VALUES (1, 0)",
+    ] + [
+        f"""
+        CREATE TRIGGER trg_{table}_{event.lower()}_version AFTER {event} ON {table}
+        FOR EACH ROW UPDATE data_version SET version = version + 1 WHERE id = 1
+        """
+        for table in ("transactions", "books", "users", "authors")
+        for event in ("INSERT", "UPDATE")
+    ]),
+    (9, "report filter indexes", [
+        "CREATE INDEX idx_report_loans_author ON report_loans (author, issue_date)",
+        "CREATE INDEX idx_report_loans_user ON report_loans (user_name, issue_date)",
+    ]),
+    (10, "due dates and fines", [
+        """
+        ALTER TABLE transactions
+            ADD COLUMN due_date DATE NULL,
+            ADD INDEX idx_transactions_overdue (return_date, due_date)
+        """,
+        f"UPDATE transactions SET due_date = DATE_ADD(issue_date, INTERVAL {LOAN_PERIOD_DAYS} DAY)",
+        """
+        ALTER TABLE report_loans
+            ADD COLUMN due_date DATE NULL,
+            ADD INDEX idx_report_loans_due (return_date, due_date)
+        """,
+        # Re-flatten everything on the next refresh so report_loans picks up due dates
+        "UPDATE report_refresh SET refreshed_until = '1970-01-01 00:00:00'",
+        """
+        CREATE TABLE IF NOT EXISTS fines (
+            transaction_id INT PRIMARY KEY,
+            user_id INT NOT NULL,
+            days_overdue INT NOT NULL,
+            amount DECIMAL(10, 2) NOT NULL,
+            assessed_on DATE NOT NULL,
+            INDEX idx_fines_user (user_id),
+            FOREIGN KEY (transaction_id) REFERENCES transactions(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS job_runs (
+            name VARCHAR(64) PRIMARY KEY,
+            last_run DATETIME NOT NULL
+        )
+        """,
+        "INSERT INTO job_runs (name, last_run) VALUES ('fines', '1970-01-01 00:00:00')",
+        "DROP PROCEDURE IF EXISTS issue_book",
+        """
+        CREATE PROCEDURE issue_book(IN p_user_id INT, IN p_book_id INT, IN p_issue_date DATE,
+                                    IN p_due_date DATE)
+        BEGIN
+            DECLARE v_book_id INT DEFAULT NULL;
+            DECLARE v_holder_id INT DEFAULT NULL;
+            DECLARE EXIT HANDLER FOR SQLEXCEPTION
+            BEGIN
+                ROLLBACK;
+                RESIGNAL;
+            END;
+
+            START TRANSACTION;
+            IF NOT EXISTS (SELECT 1 FROM users WHERE id = p_user_id) THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'User not found';
+            END IF;
+
+            -- Locking the copy makes a second desk wait here, then see it is taken
+            SELECT id, current_user_id INTO v_book_id, v_holder_id FROM books WHERE id = p_book_id FOR UPDATE;
+            IF v_book_id IS NULL THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Book not found';
+            END IF;
+            IF v_holder_id IS NOT NULL THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Conflict: this copy is already issued';
+            END IF;
+
+            INSERT INTO transactions (user_id, book_id, issue_date, due_date)
+            VALUES (p_user_id, p_book_id, p_issue_date, p_due_date);
+            UPDATE books SET current_user_id = p_user_id, current_issue_date = p_issue_date WHERE id = p_book_id;
+            COMMIT;
+        END
+        """,
+    ]),
+    # Version 3 stopped at the first index that failed to build
+    (11, "retry ngram FULLTEXT search indexes", add_search_indexes),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]  # the version this client expects
+
+# (description, query, {table or alias: index it should be read through}) for
+# the hot queries; checked with EXPLAIN by ``main.py --check-indexes``
+QUERY_PLAN_CHECKS = [
+    ("login / user by name",
+     "SELECT id FROM users WHERE name = 'admin'",
+     {"users": "idx_users_name"}),
+    ("admin panel members",
+     "SELECT name FROM users WHERE is_admin = FALSE",
+     {"users": "idx_users_is_admin"}),
+    ("book by title",
+     "SELECT id FROM books WHERE title = ''",
+     {"books": "idx_books_title"}),
+    ("closing a loan",
+     "SELECT id FROM transactions WHERE book_id = 1 AND return_date IS NULL",
+     {"transactions": "idx_transactions_book_open"}),
+    ("open loans of a member",
+     "SELECT id FROM books WHERE current_user_id = 1",
+     {"books": "idx_books_current_user"}),
+    ("available books",
+     "SELECT title FROM books WHERE current_user_id IS NULL",
+     {"books": "idx_books_current_user"}),
+    ("reporting refresh: changed loans",
+     "SELECT id FROM transactions WHERE updated_at >= NOW() - INTERVAL 1 DAY",
+     {"transactions": "idx_transactions_updated_at"}),
+    ("issued books report",
+     "SELECT title FROM report_loans WHERE return_date IS NULL ORDER BY issue_date",
+     {"report_loans": "idx_report_loans_open"}),
+    ("report: loans in a date range",
+     "SELECT title FROM report_loans WHERE issue_date BETWEEN '2024-03-01' AND '2024-03-31'",
+     {"report_loans": "idx_report_loans_issue_date"}),
+    ("overdue loans",
+     "SELECT id FROM transactions WHERE return_date IS NULL AND due_date < '2024-01-01'",
+     {"transactions": "idx_transactions_overdue"}),
+    ("report: books never loaned",
+     "SELECT b.title FROM books b WHERE NOT EXISTS (SELECT 1 FROM report_loans r WHERE r.book_id = b.id)",
+     {"r": "idx_report_loans_book"}),
+    ("report: loans by author",
+     "SELECT title FROM report_loans WHERE author LIKE 'Tol%'",
+     {"report_loans": "idx_report_loans_author"}),
+]
+
+# Refills report_loans for the loans touched by rows changed since %s; run
+# once per source table, with {changed} being that table's updated_at
+REPORT_LOANS_UPSERT = """
+    INSERT INTO report_loans (transaction_id, book_id, user_id, serial_number, title, author, user_name,
+                              address, book_location, issue_date, return_date, due_date)
+    SELECT t.id, b.id, u.id, b.serial_number, b.title, a.name, u.name, u.address, b.location,
+           t.issue_date, t.return_date, t.due_date
+    FROM transactions t
+    JOIN books b ON b.id = t.book_id
+    LEFT JOIN authors a ON a.id = b.author_id
+    JOIN users u ON u.id = t.user_id
+    WHERE {changed} >= %s
+    ON DUPLICATE KEY UPDATE book_id = VALUES(book_id), user_id = VALUES(user_id),
+        serial_number = VALUES(serial_number), title = VALUES(title), author = VALUES(author),
+        user_name = VALUES(user_name), address = VALUES(address), book_location = VALUES(book_location),
+        issue_date = VALUES(issue_date), return_date = VALUES(return_date), due_date = VALUES(due_date)
+"""
+REPORT_LOANS_CHANGED = ["t.updated_at", "b.updated_at", "u.updated_at", "a.updated_at"]
+
+# Report SELECTs over report_loans; build_report_query() fills in {where}
+LOAN_COLUMNS = """serial_number, title, author, user_name as user,
+                  COALESCE(address, book_location) as location, issue_date, return_date"""
+REPORT_QUERIES = {
+    "all_books": f"""
+        SELECT {LOAN_COLUMNS} FROM report_loans WHERE {{where}}
+        UNION ALL
+        SELECT b.serial_number, b.title, a.name, NULL, b.location, NULL, NULL
+        FROM books b
+        LEFT JOIN authors a ON b.author_id = a.id
+        WHERE NOT EXISTS (SELECT 1 FROM report_loans r WHERE r.book_id = b.id) AND {{book_where}}
+        ORDER BY title
+    """,
+    "issued_books": """
+        SELECT serial_number, title, author, user_name as user, address as location, issue_date
+        FROM report_loans
+        WHERE return_date IS NULL AND {where}
+        ORDER BY issue_date
+    """,
+    "transaction_history": f"""
+        SELECT {LOAN_COLUMNS} FROM report_loans WHERE {{where}}
+        ORDER BY issue_date DESC
+    """,
+    "overdue_fines": """
+        SELECT r.serial_number, r.title, r.user_name as user, r.issue_date, r.due_date, r.return_date,
+               f.days_overdue, f.amount as fine
+        FROM fines f
+        JOIN report_loans r ON r.transaction_id = f.transaction_id
+        WHERE {where}
+        ORDER BY f.amount DESC, r.due_date
+    """,
+    "top_books": """
+        SELECT title, author, COUNT(*) as loans, COUNT(DISTINCT user_id) as members
+        FROM report_loans
+        WHERE {where}
+        GROUP BY title, author
+        ORDER BY loans DESC, title
+    """,
+    "loans_per_month": """
+        SELECT DATE_FORMAT(issue_date, '%Y-%m') as month, COUNT(*) as loans,
+               SUM(return_date IS NULL) as still_open, COUNT(DISTINCT user_id) as members
+        FROM report_loans
+        WHERE {where}
+        GROUP BY month
+        ORDER BY month
+    """,
+    "loan_duration": """
+        SELECT DATE_FORMAT(issue_date, '%Y-%m') as month, COUNT(*) as returned_loans,
+               ROUND(AVG(DATEDIFF(return_date, issue_date)), 1) as average_days,
+               MAX(DATEDIFF(return_date, issue_date)) as longest_days
+        FROM report_loans
+        WHERE return_date IS NOT NULL AND {where}
+        GROUP BY month
+        ORDER BY month
+    """,
+}
+
+def build_report_query(report_type, filters, limit=None):
+    """Return ``(query, params)`` for a report with ``filters`` pushed into its WHERE clause.
+
+    ``filters`` may hold ``date_field`` with ``date_from``/``date_to``,
+    ``author``, ``user`` and ``location`` (prefixes, the location a
+    substring), ``overdue`` and, for top_books, ``top``. Never-loaned books
+    only appear in all_books while no loan-only filter is set.
+    """
+    where, params = [], []
+    book_where, book_params = [], []
+    loan_only = False
+    date_field = filters.get("date_field", "issue_date")
+    if filters.get("date_from"):
+        where.append(f"{date_field} >= %s")
+        params.append(filters["date_from"])
+        loan_only = True
+    if filters.get("date_to"):
+        where.append(f"{date_field} <= %s")
+        params.append(filters["date_to"])
+        loan_only = True
+    if filters.get("author"):
+        where.append("author LIKE %s")
+        params.append(filters["author"] + "%")
+        book_where.append("a.name LIKE %s")
+        book_params.append(filters["author"] + "%")
+    if filters.get("user"):
+        where.append("user_name LIKE %s")
+        params.append(filters["user"] + "%")
+        loan_only = True
+    if filters.get("location"):
+        where.append("COALESCE(address, book_location) LIKE %s")
+        params.append(f"%{filters['location']}%")
+        book_where.append("b.location LIKE %s")
+        book_params.append(f"%{filters['location']}%")
+    if filters.get("overdue"):
+        where.append("return_date IS NULL AND due_date < %s")
+        params.append(datetime.now().date())
+        loan_only = True
+
+    query = REPORT_QUERIES[report_type].format(where=" AND ".join(where) or "TRUE",
+                                               book_where="FALSE" if loan_only else " AND ".join(book_where) or "TRUE")
+    if report_type == "all_books" and not loan_only:
+        params += book_params
+    if report_type == "top_books":
+        top = filters.get("top", 10)
+        limit = top if limit is None else min(limit, top)
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, params
+
+# Loans still out, then loans returned (or corrected) since the last run. A
+# return can be backdated, so the second looks at updated_at, not return_date.
+FINE_ASSESSMENTS = [
+    """
+    INSERT INTO fines (transaction_id, user_id, days_overdue, amount, assessed_on)
+    SELECT id, user_id, DATEDIFF(COALESCE(return_date, %(today)s), due_date),
+           DATEDIFF(COALESCE(return_date, %(today)s), due_date) * %(rate)s, %(today)s
+    FROM transactions
+    WHERE {condition}
+    ON DUPLICATE KEY UPDATE days_overdue = VALUES(days_overdue), amount = VALUES(amount),
+        assessed_on = VALUES(assessed_on)
+    """.format(condition=condition)
+    for condition in ("return_date IS NULL AND due_date < %(today)s",
+                      "updated_at >= %(since)s AND return_date > due_date")
+] + [
+    # Fined while out, then returned with a date that turns out to be on time
+    """
+    DELETE f FROM fines f
+    JOIN transactions t ON t.id = f.transaction_id
+    WHERE t.updated_at >= %(since)s AND t.return_date <= t.due_date
+    """,
+]
+
+def assess_fines(conn, today):
+    """Bring the fines table up to date and return ``(overdue loans, total outstanding)``.
+
+    Runs at most once a day across all clients; later calls only read the totals.
+    """
+    cursor = conn.cursor()
+    # The row lock keeps two runs from interleaving
+    cursor.execute("SELECT last_run, NOW() FROM job_runs WHERE name = 'fines' FOR UPDATE")
+    last_run, now = cursor.fetchone()
+    if last_run.date() < today:
+        # Recomputing a fine is idempotent, so the overlap only covers writes the last run could not see
+        since = last_run - timedelta(seconds=REPORT_REFRESH_OVERLAP)
+        changed = 0
+        for statement in FINE_ASSESSMENTS:
+            cursor.execute(statement, {"today": today, "since": since, "rate": FINE_PER_DAY})
+            changed += max(cursor.rowcount, 0)
+        cursor.execute("UPDATE job_runs SET last_run = %s WHERE name = 'fines'", (now,))
+        if changed:
+            # Fines are not covered by the write triggers, so cached reports are told here
+            cursor.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+    # Committing also releases the job_runs lock when there was nothing to do
+    conn.commit()
+    cursor.execute("""
+        SELECT COUNT(*), COALESCE(SUM(f.amount), 0)
+        FROM transactions t
+        JOIN fines f ON f.transaction_id = t.id
+        WHERE t.return_date IS NULL AND t.due_date < %s
+    """, (today,))
+    overdue = cursor.fetchone()
+    cursor.close()
+    return overdue
+
+def read_data_version(conn):
+    """The counter migration 8's triggers bump on every write."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT version FROM data_version WHERE id = 1")
+    version = cursor.fetchone()[0]
+    cursor.close()
+    return version
+
+def refresh_reporting(conn):
+    """Bring report_loans up to date with the rows changed since the last refresh.
+
+    Every upsert is idempotent, so re-reading REPORT_REFRESH_OVERLAP seconds
+    behind the watermark is harmless and catches writes that were stamped
+    before the last refresh but committed after it.
+    """
+    cursor = conn.cursor()
+    # Under REPEATABLE READ the INSERT ... SELECTs would share-lock every source
+    # row they read, holding up issues and returns until the refresh commits
+    conn.commit()
+    cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+    # The row lock keeps two refreshes from interleaving
+    cursor.execute("SELECT refreshed_until, NOW() FROM report_refresh WHERE name = 'reporting' FOR UPDATE")
+    refreshed_until, now = cursor.fetchone()
+    since = refreshed_until - timedelta(seconds=REPORT_REFRESH_OVERLAP)
+    for changed in REPORT_LOANS_CHANGED:
+        cursor.execute(REPORT_LOANS_UPSERT.format(changed=changed), (since,))
+    cursor.execute("UPDATE report_refresh SET refreshed_until = %s WHERE name = 'reporting'", (now,))
+    conn.commit()
+    cursor.close()
+
+def stream_query(conn, query, params=(), chunk_size=REPORT_CHUNK_ROWS):
+    """Yield ``(cursor description, rows)`` for each ``chunk_size`` rows of ``query``.
+
+    The cursor is unbuffered, so rows are read off the socket as they are
+    consumed and memory stays flat however many rows there are.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield cursor.description, rows
+    finally:
+        # A result abandoned half-way is left unread: reading it off would pull
+        # every remaining row over the wire, so the pool closes the connection
+        if not conn.unread_result:
+            cursor.close()
+
+class CsvReportWriter:
+    def __init__(self, path, description):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([column[0] for column in description])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+class XlsxReportWriter:
+    """Rows go through a write-only workbook, which spills them to disk as
+    they are appended; a sheet that fills up continues on a new one."""
+
+    def __init__(self, path, description):
+        from openpyxl import Workbook
+        self.path = path
+        self.header = [column[0] for column in description]
+        self.workbook = Workbook(write_only=True)
+        self.sheet = None
+        self.sheet_rows = XLSX_MAX_ROWS
+
+    def write(self, rows):
+        for row in rows:
+            if self.sheet_rows >= XLSX_MAX_ROWS:
+                self.sheet = self.workbook.create_sheet()
+                self.sheet.append(self.header)
+                self.sheet_rows = 1
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+    def close(self):
+        if self.sheet is None:
+            self.workbook.create_sheet().append(self.header)
+        self.workbook.save(self.path)
+
+class ParquetReportWriter:
+    """Each chunk becomes one row group, typed from the cursor description."""
+
+    def __init__(self, path, description):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        field_type = mysql.connector.FieldType
+        types = {field_type.DATE: pa.date32(), field_type.NEWDATE: pa.date32(),
+                 field_type.DATETIME: pa.timestamp("us"), field_type.TIMESTAMP: pa.timestamp("us"),
+                 field_type.TINY: pa.int64(), field_type.SHORT: pa.int64(), field_type.INT24: pa.int64(),
+                 field_type.LONG: pa.int64(), field_type.LONGLONG: pa.int64(), field_type.YEAR: pa.int64(),
+                 field_type.FLOAT: pa.float64(), field_type.DOUBLE: pa.float64(),
+                 field_type.DECIMAL: pa.float64(), field_type.NEWDECIMAL: pa.float64()}
+        self.pa = pa
+        self.schema = pa.schema([(column[0], types.get(column[1], pa.string())) for column in description])
+        # Decimals arrive as decimal.Decimal and anything untyped is written as its text
+        self.converters = [float if field.type == pa.float64() else self.text if field.type == pa.string() else None
+                           for field in self.schema]
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    @staticmethod
+    def text(value):
+        return value.decode(errors="replace") if isinstance(value, (bytes, bytearray)) else str(value)
+
+    def write(self, rows):
+        columns = []
+        for i, (field, convert) in enumerate(zip(self.schema, self.converters)):
+            values = [row[i] for row in rows]
+            if convert is not None:
+                values = [None if value is None else convert(value) for value in values]
+            columns.append(self.pa.array(values, type=field.type))
+        self.writer.write_table(self.pa.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+# (file dialog filter, extension, module the writer needs, writer)
+REPORT_EXPORT_FORMATS = [
+    ("Excel files (*.xlsx)", ".xlsx", "openpyxl", XlsxReportWriter),
+    ("CSV files (*.csv)", ".csv", None, CsvReportWriter),
+    ("Parquet files (*.parquet)", ".parquet", "pyarrow", ParquetReportWriter),
+]
+
+def call_procedure(conn, name, args):
+    """CALL a stored procedure; a SIGNAL it raises becomes a LibraryError."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"CALL {name}({', '.join(['%s'] * len(args))})", args)
+    except mysql.connector.Error as err:
+        if err.errno == ER_SIGNAL_EXCEPTION:
+            raise LibraryError(err.msg)
+        raise
+    finally:
+        cursor.close()
+
+def check_query_plans(conn):
+    """EXPLAIN each of QUERY_PLAN_CHECKS and return a line per query."""
+    cursor = conn.cursor(dictionary=True)
+    report = []
+    for description, query, expected in QUERY_PLAN_CHECKS:
+        cursor.execute("EXPLAIN " + query)
+        plan = {row["table"]: row for row in cursor.fetchall()}
+        problems = []
+        for table, index in expected.items():
+            row = plan.get(table)
+            if row is None:
+                problems.append(f"{table} missing from plan")
+            elif row["key"] != index:
+                problems.append(f"{table} uses {row['key'] or 'a full scan'} ({row['type']}), expected {index}")
+        report.append(f"{'FAIL' if problems else 'ok  '} {description}" + "".join(f"\n       {p}" for p in problems))
+    cursor.close()
+    return report
+
+def schema_version(cursor):
+    """The newest migration applied, 0 on an empty database."""
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_migrations")
+    except mysql.connector.Error as err:
+        if err.errno != ER_NO_SUCH_TABLE:
+            raise
+        return 0
+    return cursor.fetchone()[0] or 0
+
+def provision_schema(conn):
+    """Apply any pending MIGRATIONS and seed the admin account.
+
+    Returns the (version, description) of each migration applied. A named
+    lock keeps clients that start together from migrating at the same time.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT GET_LOCK('library_schema', %s)", (SCHEMA_LOCK_TIMEOUT,))
+    if not cursor.fetchone()[0]:
+        cursor.close()
+        raise LibraryError("Timed out waiting for another client to update the database schema")
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                description VARCHAR(255),
+                applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
+        pending = [(version, description, steps) for version, description, steps in MIGRATIONS
+                   if version not in applied]
+        for version, description, steps in pending:
+            if callable(steps):
+                steps(cursor)
+            else:
+                for statement in steps:
+                    cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                           (version, description))
+            conn.commit()
+
+        cursor.execute("SELECT * FROM users WHERE name='admin'")
+        if not cursor.fetchone():
+            cursor.execute("""
+                INSERT INTO users (name, serial_number, password, is_admin)
+                VALUES (%s, %s, %s, %s)
+            """, ("admin", "0000", "admin", True))
+        conn.commit()
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK('library_schema')")
+        cursor.fetchone()
+        cursor.close()
+    return [(version, description) for version, description, _ in pending]
+
+def prepare_schema(conn):
+    """Startup check: a single SELECT when the schema is current, provisioning only when it is behind."""
+    cursor = conn.cursor()
+    version = schema_version(cursor)
+    cursor.close()
+    if version > SCHEMA_VERSION:
+        raise LibraryError(f"The database schema (version {version}) is newer than this version of the "
+                           f"application supports ({SCHEMA_VERSION}); please update the application")
+    if version < SCHEMA_VERSION:
+        # Migrating, or waiting on another client that is, can outlast the SELECT timeout
+        ConnectionPool.set_query_timeout(conn, 0)
+        try:
+            provision_schema(conn)
+        finally:
+            ConnectionPool.set_query_timeout(conn, DB_QUERY_TIMEOUT_MS)
+
+class LibraryError(Exception):
+    """A failure whose message is meant for the user and is shown as-is."""
+
+class ConnectionPool:
+    """A fixed-size, thread-safe pool of MySQL connections, opened lazily up to ``size``."""
+
+    def __init__(self, config, size=DB_POOL_SIZE, query_timeout=DB_QUERY_TIMEOUT_MS, checkout_timeout=30):
+        self.config = config
+        self.size = size
+        self.query_timeout = query_timeout
+        self.checkout_timeout = checkout_timeout
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def open(self):
+        conn = mysql.connector.connect(**self.config)
+        # Server-side SELECT timeout, in milliseconds
+        self.set_query_timeout(conn, self.query_timeout)
+        return conn
+
+    @staticmethod
+    def set_query_timeout(conn, timeout):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (int(timeout),))
+        except mysql.connector.Error as err:
+            if err.errno != ER_UNKNOWN_SYSTEM_VARIABLE:
+                raise
+            # MariaDB's equivalent is in seconds and also covers writes
+            cursor.execute("SET SESSION max_statement_time = %s", (timeout / 1000,))
+        finally:
+            cursor.close()
+
+    def acquire(self):
+        try:
+            conn, last_used = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                can_open = self.opened < self.size
+                if can_open:
+                    self.opened += 1
+            if can_open:
+                try:
+                    return self.open()
+                except Exception:
+                    with self.lock:
+                        self.opened -= 1
+                    raise
+            try:
+                conn, last_used = self.idle.get(timeout=self.checkout_timeout)
+            except queue.Empty:
+                raise LibraryError("All database connections are busy, please try again")
+
+        # The server may have dropped a connection left idle this long
+        if time.monotonic() - last_used > DB_PING_AFTER_IDLE and not conn.is_connected():
+            try:
+                conn.reconnect(attempts=3, delay=1)
+                self.set_query_timeout(conn, self.query_timeout)
+            except Exception:
+                with self.lock:
+                    self.opened -= 1
+                raise
+        return conn
+
+    def release(self, conn):
+        try:
+            if conn.unread_result:
+                # Left by a stream stopped early; closing is what stops the server sending
+                self.discard(conn)
+                return
+            if conn.in_transaction:
+                conn.rollback()
+        except Exception:
+            # A broken connection is dropped and reopened on a later checkout
+            with self.lock:
+                self.opened -= 1
+            return
+        self.idle.put((conn, time.monotonic()))
+
+    def discard(self, conn):
+        with self.lock:
+            self.opened -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+class TaskSignals(QObject):
+    done = pyqtSignal(int, bool, object)
+    progress = pyqtSignal(int, object)
+
+class DatabaseTask(QRunnable):
+    def __init__(self, task_id, fn, pool, signals, timeout=None):
+        super().__init__()
+        self.task_id = task_id
+        self.fn = fn
+        self.pool = pool
+        self.signals = signals
+        self.timeout = timeout
+        self.cancelled = False
+        self.reports_progress = False
+
+    def progress(self, payload):
+        """Hand ``payload`` to the GUI thread; returns False once the task is cancelled."""
+        if not self.cancelled:
+            self.signals.progress.emit(self.task_id, payload)
+        return not self.cancelled
+
+    def run(self):
+        if self.cancelled:
+            self.signals.done.emit(self.task_id, False, None)
+            return
+        try:
+            with self.pool.connection() as conn:
+                if self.timeout is not None:
+                    self.pool.set_query_timeout(conn, self.timeout)
+                try:
+                    result = self.fn(conn, self.progress) if self.reports_progress else self.fn(conn)
+                finally:
+                    # A connection with an unread result is closed on release, not reused
+                    if self.timeout is not None and not conn.unread_result:
+                        self.pool.set_query_timeout(conn, self.pool.query_timeout)
+        except Exception as e:
+            self.signals.done.emit(self.task_id, False, e)
+        else:
+            self.signals.done.emit(self.task_id, True, result)
+
+class DatabaseRunner(QObject):
+    """Runs ``fn(connection)`` on a QThreadPool and hands its result to ``on_result`` on the GUI thread."""
+
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, pool, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.threads = QThreadPool(self)
+        self.threads.setMaxThreadCount(pool.size)
+        self.signals = TaskSignals()
+        self.signals.done.connect(self.deliver)
+        self.signals.progress.connect(self.deliver_progress)
+        self.next_id = 0
+        self.pending = {}  # task id -> (task, on_result, on_error, error_message, key, on_progress)
+        self.latest = {}  # key -> task id of the newest request
+        self.running = {}  # key -> task id currently on a worker
+        self.waiting = {}  # key -> task held back until the running one finishes
+
+    def submit(self, fn, on_result=None, error_message="Database request failed", key=None, on_error=None,
+               timeout=None, on_progress=None):
+        self.next_id += 1
+        # ``timeout`` overrides the pool's SELECT timeout (ms) for this request only
+        task = DatabaseTask(self.next_id, fn, self.pool, self.signals, timeout)
+        # fn is then called as fn(connection, progress); progress() returns False once cancelled
+        task.reports_progress = on_progress is not None
+        if key is not None:
+            # The older request under this key is skipped if not started, its result dropped if it has
+            self.cancel(key)
+            self.latest[key] = task.task_id
+        self.pending[task.task_id] = (task, on_result, on_error, error_message, key, on_progress)
+        if len(self.pending) == 1:
+            self.busy_changed.emit(True)
+        # Requests sharing a key never overlap, so they may share worker-side state
+        # such as a PagedQuery; the GUI thread passes its own state in with each one
+        if key is not None and key in self.running:
+            self.waiting[key] = task
+        else:
+            self.start(task, key)
+        return task.task_id
+
+    def start(self, task, key):
+        if key is not None:
+            self.running[key] = task.task_id
+        self.threads.start(task)
+
+    def cancel(self, key):
+        task_id = self.latest.pop(key, None)
+        if task_id in self.pending:
+            self.pending[task_id][0].cancelled = True
+        waiting = self.waiting.pop(key, None)
+        if waiting is not None:
+            # Never started, so it will not report back on its own
+            self.pending.pop(waiting.task_id, None)
+            if not self.pending:
+                self.busy_changed.emit(False)
+
+    def deliver(self, task_id, ok, payload):
+        task, on_result, on_error, error_message, key, _ = self.pending.pop(task_id)
+        if key is not None and self.running.get(key) == task_id:
+            del self.running[key]
+            if key in self.waiting:
+                self.start(self.waiting.pop(key), key)
+        if self.latest.get(key) == task_id:
+            del self.latest[key]
+        if not self.pending:
+            self.busy_changed.emit(False)
+        if task.cancelled:
+            return
+        if ok:
+            if on_result:
+                on_result(payload)
+        elif on_error:
+            on_error(payload)
+        elif isinstance(payload, LibraryError):
+            QMessageBox.critical(self.parent(), "Error", str(payload))
+        elif isinstance(payload, mysql.connector.Error):
+            QMessageBox.critical(self.parent(), "Error", f"Database error: {payload}")
+        else:
+            QMessageBox.critical(self.parent(), "Error", f"{error_message}: {payload}")
+
+    def deliver_progress(self, task_id, payload):
+        entry = self.pending.get(task_id)
+        if entry is not None and not entry[0].cancelled:
+            entry[5](payload)
+
+    def wait(self):
+        self.waiting.clear()
+        for entry in self.pending.values():
+            entry[0].cancelled = True
+        self.threads.waitForDone()
+
+class TrigramIndex:
+    """In-memory trigram index for substring search over ``(key, text)`` pairs.
+
+    A term's candidates are the intersection of the posting sets of its
+    trigrams, so a lookup touches only a few hundred entries even across
+    100k+ rows. Matches are ranked prefix-first, then by text length.
+    """
+
+    def __init__(self, rows=()):
+        self.texts = {}
+        self.postings = defaultdict(set)
+        for key, text in rows:
+            self.add(key, text)
+
+    @staticmethod
+    def trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, key, text):
+        text = (text or "").lower()
+        self.texts[key] = text
+        for gram in self.trigrams(text):
+            self.postings[gram].add(key)
+
+    def search(self, term, limit=SEARCH_MAX_RESULTS):
+        term = term.lower()
+        grams = sorted((self.postings.get(gram, set()) for gram in self.trigrams(term)), key=len)
+        if grams:
+            candidates = set(grams[0]).intersection(*grams[1:])
+        else:
+            # Terms shorter than a trigram have to be checked against every text
+            candidates = self.texts.keys()
+        matches = []
+        for key in candidates:
+            position = self.texts[key].find(term)
+            if position >= 0:
+                matches.append((position != 0, len(self.texts[key]), key))
+        matches.sort()
+        return [key for _, _, key in matches[:limit]]
+
+class TextSearch:
+    """The WHERE clause and ranking behind one table's search box: ngram FULLTEXT where
+    the server has the indexes, otherwise a TrigramIndex built from ``index_query``."""
+
+    def __init__(self, key, match_columns, row_fields, index_query, fulltext=True):
+        self.key = key
+        self.match_columns = match_columns  # one entry per FULLTEXT index
+        self.row_fields = row_fields  # per FULLTEXT index, its columns' positions in a fetched row
+        self.index_query = index_query
+        self.fulltext = fulltext
+        self.index = None
+
+    def invalidate(self):
+        self.index = None
+
+    @staticmethod
+    def words(term):
+        return [word.lower() for word in re.findall(r"\w+", term) if len(word) >= NGRAM_TOKEN_SIZE]
+
+    def mode(self, term):
+        if not self.fulltext:
+            return "trigram"
+        return "fulltext" if self.words(term) else "prefix"
+
+    def matches(self, row, term):
+        """Whether a fetched ``row`` matches ``term``, the local twin of :meth:`clause`."""
+        texts = [" ".join(str(row[i] or "") for i in fields).lower() for fields in self.row_fields]
+        mode = self.mode(term)
+        if mode == "fulltext":
+            words = self.words(term)
+            return any(all(word in text for word in words) for text in texts)
+        if mode == "prefix":
+            term = term.lower()
+            return any(str(row[i] or "").lower().startswith(term) for fields in self.row_fields for i in fields)
+        return term.strip().lower() in " ".join(texts)
+
+    def clause(self, cursor, term):
+        """Return ``(condition, params, order, order_params)`` for ``term``."""
+        words = self.words(term)
+        if self.fulltext and words:
+            against = " ".join(f'+"{word}"' for word in words)
+            matches = [f"MATCH({columns}) AGAINST(%s IN BOOLEAN MODE)" for columns in self.match_columns]
+            params = [against] * len(matches)
+            return f"({' OR '.join(matches)})", params, f"({' + '.join(matches)}) DESC", params
+        if self.fulltext:
+            # Too short for an ngram token, a prefix match is the best we can do
+            columns = [column.strip() for group in self.match_columns for column in group.split(",")]
+            params = [f"{term}%"] * len(columns)
+            return f"({' OR '.join(f'{column} LIKE %s' for column in columns)})", params, None, []
+
+        if self.index is None:
+            cursor.execute(self.index_query)
+            self.index = TrigramIndex(cursor.fetchall())
+        keys = self.index.search(term.strip())
+        if not keys:
+            return "FALSE", [], None, []
+        placeholders = ", ".join(["%s"] * len(keys))
+        return f"{self.key} IN ({placeholders})", keys, f"FIELD({self.key}, {placeholders})", keys
+
+class PagedQuery:
+    """One page of a SELECT at a time, ordered by ``key``, the last of ``columns``.
+    Owned by the worker running the table's requests; the GUI thread keeps a PagePosition."""
+
+    def __init__(self, columns, source, key, search, page_size=PAGE_SIZES[0], count_source=None):
+        self.columns = columns
+        self.source = source
+        self.key = key
+        self.search = search
+        self.count_source = count_source or source
+        self.page_size = page_size
+        self.counts = {}  # search term -> total matching rows
+        self.search_cache = OrderedDict()  # search term -> (ranked rows, whether that is every match)
+        self.stale = False
+        self.reset()
+
+    def reset(self, search_term=""):
+        self.search_term = search_term
+        self.current_page = 1
+        self.rows = []
+        self.rows_page = None  # page number ``rows`` belong to
+        self.prefetched = None
+
+    def invalidate(self):
+        # Call after writes to the underlying tables; the caches are dropped by the next fetch, on its worker
+        self.stale = True
+
+    def drop_caches(self):
+        self.stale = False
+        self.counts.clear()
+        self.search_cache.clear()
+        self.prefetched = None
+        self.search.invalidate()
+
+    def total(self):
+        return self.counts.get(self.search_term, 0)
+
+    def page_count(self):
+        return max(1, (self.total() + self.page_size - 1) // self.page_size)
+
+    def seek(self, page, rows):
+        """Continue paging from ``rows``, already fetched as page ``page``."""
+        if self.rows_page != page:
+            self.prefetched = None
+        self.current_page, self.rows, self.rows_page = page, rows, page
+
+    def search_clause(self, cursor):
+        if not self.search_term:
+            return [], [], None, []
+        condition, params, order, order_params = self.search.clause(cursor, self.search_term)
+        return [condition], list(params), order, list(order_params)
+
+    def count(self, cursor):
+        if self.search_term not in self.counts:
+            conditions, params, _, _ = self.search_clause(cursor)
+            query = f"SELECT COUNT(*) FROM {self.count_source}"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            cursor.execute(query, params)
+            self.counts[self.search_term] = cursor.fetchone()[0]
+        return self.counts[self.search_term]
+
+    def cached_search(self, cursor):
+        term = self.search_term
+        if term in self.search_cache:
+            self.search_cache.move_to_end(term)
+            return self.search_cache[term]
+
+        # A longer term filters a complete cached superset instead of querying again
+        mode = self.search.mode(term)
+        for previous, (rows, complete) in reversed(self.search_cache.items()):
+            if complete and term.startswith(previous) and self.search.mode(previous) == mode:
+                entry = ([row for row in rows if self.search.matches(row, term)], True)
+                break
+        else:
+            # Up to SEARCH_CACHE_ROWS ranked matches in one query, paged through locally
+            conditions, params, rank, rank_params = self.search_clause(cursor)
+            query = f"SELECT {self.columns} FROM {self.source} WHERE {conditions[0]}"
+            if rank:
+                query += f" ORDER BY {rank}, {self.key} LIMIT %s"
+                params += rank_params
+            else:
+                query += f" ORDER BY {self.key} LIMIT %s"
+            cursor.execute(query, params + [SEARCH_CACHE_ROWS + 1])
+            rows = cursor.fetchall()
+            entry = (rows[:SEARCH_CACHE_ROWS], len(rows) <= SEARCH_CACHE_ROWS)
+
+        if entry[1]:
+            self.counts[term] = len(entry[0])
+        self.search_cache[term] = entry
+        while len(self.search_cache) > SEARCH_CACHE_SIZE:
+            self.search_cache.popitem(last=False)
+        return entry
+
+    def fetch(self, cursor, position, direction=None, anchor=None):
+        """Return the page ``position`` (a PagePosition.request()) asks for; ``direction`` is
+        relative to the page fetched before, or to ``anchor``, a (page, rows) already fetched."""
+        search_term, page, page_size = position
+        if self.stale:
+            self.drop_caches()
+        if search_term != self.search_term or page_size != self.page_size:
+            self.page_size = page_size
+            self.reset(search_term)
+        if anchor is not None:
+            self.seek(*anchor)
+        self.current_page = page
+        try:
+            return self.fetch_page(cursor, direction)
+        except mysql.connector.Error as err:
+            if err.errno != ER_FT_MATCHING_KEY_NOT_FOUND or not self.search.fulltext:
+                raise
+            # The server has no FULLTEXT index here; search this table through a TrigramIndex
+            self.search.fulltext = False
+            self.search_cache.clear()
+            self.counts.pop(self.search_term, None)
+            return self.fetch_page(cursor, direction)
+
+    def fetch_page(self, cursor, direction):
+        if self.search_term:
+            matches, complete = self.cached_search(cursor)
+            start = (self.current_page - 1) * self.page_size
+            if complete or start + self.page_size <= len(matches):
+                rows = matches[start:start + self.page_size]
+                self.count(cursor)
+                self.rows = rows
+                self.rows_page = self.current_page
+                self.prefetched = None
+                return rows
+
+        # Seeking only works from the page next to the one requested; a
+        # superseded request may have skipped a page in between.
+        if direction == "next" and self.rows_page != self.current_page - 1:
+            direction = None
+        elif direction == "prev" and self.rows_page != self.current_page + 1:
+            direction = None
+
+        if direction == "next" and self.prefetched is not None:
+            rows, self.prefetched = self.prefetched, None
+        else:
+            # Next/Previous seek past the keys on screen, other jumps use OFFSET; reading
+            # a page ahead means the following Next needs no query
+            conditions, params, rank, rank_params = self.search_clause(cursor)
+            order, limit, offset = "ASC", self.page_size * 2, 0
+            if rank:
+                offset = (self.current_page - 1) * self.page_size
+            elif direction == "next" and self.rows:
+                conditions.append(f"{self.key} > %s")
+                params.append(self.rows[-1][-1])
+            elif direction == "prev" and self.rows:
+                conditions.append(f"{self.key} < %s")
+                params.append(self.rows[0][-1])
+                order, limit = "DESC", self.page_size
+            else:
+                offset = (self.current_page - 1) * self.page_size
+
+            query = f"SELECT {self.columns} FROM {self.source}"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            if rank:
+                query += f" ORDER BY {rank}, {self.key} LIMIT %s OFFSET %s"
+                params += rank_params
+            else:
+                query += f" ORDER BY {self.key} {order} LIMIT %s OFFSET %s"
+            cursor.execute(query, params + [limit, offset])
+            rows = cursor.fetchall()
+
+            if order == "DESC":
+                rows.reverse()
+                # The page we are leaving is the next page from here
+                self.prefetched = self.rows or None
+            else:
+                rows, self.prefetched = rows[:self.page_size], rows[self.page_size:] or None
+
+        self.count(cursor)
+        self.rows = rows
+        self.rows_page = self.current_page
+        return rows
+
+class PagePosition:
+    """The search term, page and page size a paginated table is showing, kept on the GUI thread."""
+
+    def __init__(self, page_size=PAGE_SIZES[0]):
+        self.search_term = ""
+        self.page = 1
+        self.page_size = page_size
+        self.page_count = 1
+
+    def reset(self, search_term=""):
+        self.search_term = search_term
+        self.page = 1
+
+    def request(self):
+        return self.search_term, self.page, self.page_size
+
+    def next_page(self):
+        if self.page < self.page_count:
+            self.page += 1
+            return True
+        return False
+
+    def prev_page(self):
+        if self.page > 1:
+            self.page -= 1
+            return True
+        return False
+
+    def goto_page(self, page):
+        self.page = min(max(1, page), self.page_count)
+
+    def set_page_size(self, page_size):
+        self.page_size = page_size
+        self.page = 1
+
+class LookupModel(QAbstractListModel):
+    """The texts of one column of ``table``, loaded LOOKUP_BATCH_SIZE rows at a time.
+
+    Views call ``fetchMore`` as they are scrolled to the end, so a picker
+    over thousands of rows only loads what is actually looked at. Each batch
+    seeks past the last (text, id) loaded, and ``reload(prefix)`` narrows the
+    rows to texts starting with ``prefix``; with ``prefix_required`` nothing
+    is loaded until there is one. ``Qt.UserRole`` holds the row id.
+    """
+
+    def __init__(self, runner, table, column, condition=None, parent=None, prefix_required=False):
+        super().__init__(parent)
+        self.runner = runner
+        self.table = table
+        self.column = column
+        self.condition = condition
+        self.prefix_required = prefix_required
+        self.key = f"lookup_{id(self)}"
+        self.prefix = ""
+        self.items = []  # (id, text)
+        self.exhausted = False
+        self.loading = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item_id, text = self.items[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return text
+        if role == Qt.UserRole:
+            return item_id
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted or self.loading:
+            return False
+        return bool(self.prefix) or not self.prefix_required
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.loading = True
+        column = self.column
+        conditions = [self.condition] if self.condition else []
+        params = []
+        if self.prefix:
+            conditions.append(f"{column} LIKE %s")
+            params.append(re.sub(r"([\\%_])", r"\\\1", self.prefix) + "%")
+        if self.items:
+            last_id, last_text = self.items[-1]
+            conditions.append(f"({column} > %s OR ({column} = %s AND id > %s))")
+            params += [last_text, last_text, last_id]
+        query = f"SELECT id, {column} FROM {self.table}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {column}, id LIMIT %s"
+
+        def fetch(conn):
+            cursor = conn.cursor()
+            cursor.execute(query, params + [LOOKUP_BATCH_SIZE])
+            rows = cursor.fetchall()
+            cursor.close()
+            return rows
+
+        self.runner.submit(fetch, self.append_rows, key=self.key, on_error=self.fetch_failed)
+
+    def append_rows(self, rows):
+        self.loading = False
+        self.exhausted = len(rows) < LOOKUP_BATCH_SIZE
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self.items), len(self.items) + len(rows) - 1)
+            self.items.extend(tuple(row) for row in rows)
+            self.endInsertRows()
+
+    def fetch_failed(self, err):
+        # Stop here rather than retrying on every scroll
+        self.loading = False
+        self.exhausted = True
+        QMessageBox.critical(self.runner.parent(), "Error", f"Failed to load choices: {err}")
+
+    def reload(self, prefix=""):
+        self.runner.cancel(self.key)
+        self.beginResetModel()
+        self.prefix = prefix
+        self.items = []
+        self.exhausted = False
+        self.loading = False
+        self.endResetModel()
+
+class LookupComboBox(QComboBox):
+    """Editable picker over a LookupModel with a type-ahead completer.
+
+    The drop-down lists every row, loaded as it is scrolled. Typing reloads
+    a second, prefix-filtered model behind the completer once the user
+    pauses. ``chosen`` is emitted with the id of the row picked, or None
+    when the text typed names no row; ``selected_id`` returns the same.
+    """
+
+    chosen = pyqtSignal(object)
+
+    def __init__(self, runner, table, column, condition=None, parent=None):
+        super().__init__(parent)
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.NoInsert)
+        self.setModel(LookupModel(runner, table, column, condition, self))
+        self.matches = LookupModel(runner, table, column, condition, self, prefix_required=True)
+        self.matches.rowsInserted.connect(self.show_matches)
+        completer = QCompleter(self.matches, self)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setCompletionMode(QCompleter.PopupCompletion)
+        completer.activated[QModelIndex].connect(self.choose_index)
+        self.setCompleter(completer)
+        self.choice = None  # (id, text) of the row picked
+
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.filter_matches)
+        self.lineEdit().textEdited.connect(self.filter_timer.start)
+        self.lineEdit().editingFinished.connect(self.choose_text)
+        self.activated[int].connect(lambda row: self.choose_index(self.model().index(row, 0)))
+
+    def showPopup(self):
+        if not self.model().rowCount() and self.model().canFetchMore(QModelIndex()):
+            self.model().fetchMore(QModelIndex())
+        super().showPopup()
+
+    def setPlaceholderText(self, text):
+        super().setPlaceholderText(text)
+        self.lineEdit().setPlaceholderText(text)
+
+    def filter_matches(self):
+        prefix = self.currentText().strip()
+        if (self.matches.exhausted and not self.matches.loading
+                and prefix.lower().startswith(self.matches.prefix.lower())):
+            # Already holds every match; the completer narrows it locally
+            return
+        self.matches.reload(prefix)
+        self.matches.fetchMore()
+
+    def show_matches(self):
+        if self.lineEdit().hasFocus() and self.currentText().strip():
+            self.completer().complete()
+
+    def choose_index(self, index):
+        self.set_choice(index.data(Qt.UserRole), index.data())
+
+    def choose_text(self):
+        text = self.currentText().strip()
+        if self.choice is not None and self.choice[1] == text:
+            return
+        # Typed out in full rather than picked: take a loaded row with that text
+        for model in (self.matches, self.model()):
+            for item_id, item_text in model.items:
+                if item_text.lower() == text.lower():
+                    self.setEditText(item_text)
+                    self.set_choice(item_id, item_text)
+                    return
+        self.set_choice(None, text)
+
+    def set_choice(self, item_id, text):
+        if self.choice != (item_id, text):
+            self.choice = (item_id, text)
+            self.chosen.emit(item_id)
+
+    def selected_id(self):
+        if self.choice is not None and self.choice[1] == self.currentText().strip():
+            return self.choice[0]
+        return None
+
+    def reload(self):
+        self.filter_timer.stop()
+        self.model().reload()
+        self.matches.reload()
+        self.setCurrentIndex(-1)
+        self.clearEditText()
+        self.choice = None
+
+class RowsModel(QAbstractTableModel):
+    """A read-only table model over one page of query rows.
+
+    Each row ends with its key, which is not shown. An ``action`` adds a
+    trailing "Actions" column whose cells hold just the action's name, for a
+    ButtonDelegate to draw.
+    """
+
+    def __init__(self, headers, action=None, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers) + (["Actions"] if action else [])
+        self.action = action
+        self.rows = []
+        self.row_offset = 0  # rows before the first one held, for numbering
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        if self.action and index.column() == len(self.headers) - 1:
+            return self.action
+        value = self.rows[index.row()][index.column()]
+        return str(value) if value else ''
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(self.row_offset + section + 1)
+
+    def set_rows(self, rows, row_offset=0):
+        self.beginResetModel()
+        self.rows = [list(row) for row in rows]
+        self.row_offset = row_offset
+        self.endResetModel()
+
+    def insert_rows(self, position, rows):
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), position, position + len(rows) - 1)
+        self.rows[position:position] = [list(row) for row in rows]
+        self.endInsertRows()
+
+    def remove_rows(self, position, count):
+        if not count:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position + count - 1)
+        del self.rows[position:position + count]
+        self.endRemoveRows()
+
+    def value(self, row, column):
+        return self.rows[row][column]
+
+    def key(self, row):
+        return self.rows[row][-1]
+
+    def row_of(self, key):
+        for row, values in enumerate(self.rows):
+            if values[-1] == key:
+                return row
+        return None
+
+    def update_row(self, key, changes):
+        """Set ``changes`` (column -> value) on the row with ``key``, if it is still shown."""
+        row = self.row_of(key)
+        if row is None:
+            return
+        for column, value in changes.items():
+            self.rows[row][column] = value
+        self.dataChanged.emit(self.index(row, min(changes)), self.index(row, max(changes)))
+
+class InfiniteScroll(QObject):
+    """Feeds a RowsModel from a PagedQuery as its view is scrolled.
+
+    Pages of SCROLL_CHUNK_ROWS serve as chunks. Nearing the end of the rows
+    held fetches the next one (seeking past the last key held), nearing the
+    top fetches the one before, and at most SCROLL_WINDOW_CHUNKS are held:
+    the chunk at the far end from the one just added is dropped, so browsing
+    a whole catalog keeps a bounded number of rows in memory.
+    """
+
+    def __init__(self, view, model, paged, runner, key, status_label, error_message):
+        super().__init__(view)
+        self.view = view
+        self.model = model
+        self.paged = paged
+        self.runner = runner
+        self.key = key
+        self.status_label = status_label
+        self.error_message = error_message
+        self.enabled = False
+        self.loading = False
+        self.pages = []  # page number of each chunk held, top to bottom
+        self.sizes = []  # rows in each chunk held
+        self.search_term = ""
+        self.page_count = 1
+        self.total = 0
+        view.verticalScrollBar().valueChanged.connect(self.check)
+
+    def start(self, search_term=""):
+        self.enabled = True
+        self.search_term = search_term
+        self.pages, self.sizes = [], []
+        self.model.set_rows([])
+        self.fetch(1, None, None, None)
+
+    def stop(self):
+        self.enabled = False
+        self.loading = False
+        self.runner.cancel(self.key)
+
+    def fetch(self, page, anchor_page, anchor_rows, direction):
+        paged = self.paged
+        position = (self.search_term, page, SCROLL_CHUNK_ROWS)
+        anchor = (anchor_page, anchor_rows) if anchor_rows is not None else None
+
+        def fetch_chunk(conn):
+            cursor = conn.cursor()
+            rows = paged.fetch(cursor, position, direction, anchor)
+            cursor.close()
+            return rows, paged.page_count(), paged.total()
+
+        self.loading = True
+        self.runner.submit(fetch_chunk, lambda result: self.add_chunk(page, *result), self.error_message,
+                           key=self.key, on_error=self.fetch_failed)
+
+    def fetch_failed(self, err):
+        self.loading = False
+        QMessageBox.critical(self.runner.parent(), "Error", f"{self.error_message}: {err}")
+
+    def add_chunk(self, page, rows, page_count, total):
+        self.loading = False
+        if not self.enabled:
+            return
+        self.page_count, self.total = page_count, total
+        bar = self.view.verticalScrollBar()
+        if not self.pages or page > self.pages[-1]:
+            self.model.insert_rows(self.model.rowCount(), rows)
+            self.pages.append(page)
+            self.sizes.append(len(rows))
+            if len(self.pages) > SCROLL_WINDOW_CHUNKS:
+                self.pages.pop(0)
+                dropped = self.sizes.pop(0)
+                self.model.remove_rows(0, dropped)
+                bar.setValue(bar.value() - dropped)
+        else:
+            self.model.insert_rows(0, rows)
+            self.pages.insert(0, page)
+            self.sizes.insert(0, len(rows))
+            # Keep the rows on screen where they were
+            bar.setValue(bar.value() + len(rows))
+            if len(self.pages) > SCROLL_WINDOW_CHUNKS:
+                self.pages.pop()
+                dropped = self.sizes.pop()
+                self.model.remove_rows(self.model.rowCount() - dropped, dropped)
+        self.model.row_offset = (self.pages[0] - 1) * SCROLL_CHUNK_ROWS
+        self.model.headerDataChanged.emit(Qt.Vertical, 0, max(0, self.model.rowCount() - 1))
+        # The viewport may still be near an edge, e.g. when a chunk is shorter than the view
+        QTimer.singleShot(0, self.check)
+
+    def check(self):
+        if not self.enabled or not self.pages:
+            return
+        rows = self.model.rowCount()
+        first = max(0, self.view.rowAt(0))
+        last = self.view.rowAt(self.view.viewport().height() - 1)
+        if last < 0:
+            last = rows - 1
+        if rows:
+            self.status_label.setText(f"Rows {self.model.row_offset + first + 1}-{self.model.row_offset + last + 1} "
+                                      f"of {self.total}")
+        else:
+            self.status_label.setText("No rows")
+        if self.loading:
+            return
+        if last >= rows - SCROLL_FETCH_MARGIN and self.pages[-1] < self.page_count:
+            self.fetch(self.pages[-1] + 1, self.pages[-1], self.model.rows[rows - self.sizes[-1]:], "next")
+        elif first < SCROLL_FETCH_MARGIN and self.pages[0] > 1:
+            self.fetch(self.pages[0] - 1, self.pages[0], self.model.rows[:self.sizes[0]], "prev")
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Draws a column's cells as buttons, so no widget is created per row.
+
+    ``clicked`` carries the row whose button was clicked.
+    """
+
+    clicked = pyqtSignal(int)
+
+    def paint(self, painter, option, index):
+        rect = option.rect.adjusted(6, 6, -6, -6)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        gradient = QLinearGradient(rect.topLeft(), rect.topRight())
+        gradient.setColorAt(0, QColor("#ffb74d" if hovered else "#ff9800"))
+        gradient.setColorAt(1, QColor("#ff9800" if hovered else "#f57c00"))
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QColor("#ffb74d" if hovered else "#f57c00"))
+        painter.setBrush(gradient)
+        painter.drawRoundedRect(rect, 8, 8)
+        painter.setPen(QColor("white"))
+        painter.drawText(rect, Qt.AlignCenter, index.data())
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(150, 50)
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and option.rect.contains(event.pos())):
+            self.clicked.emit(index.row())
+            return True
+        return False
+
+class DataFrameModel(QAbstractTableModel):
+    """A read-only table model over DataFrames appended chunk by chunk.
+
+    Views only ask for the cells on screen, so a million-row report costs a
+    few hundred lookups per repaint. Rows are kept as the chunks they came
+    in until the first sort, which concatenates them once and reorders the
+    frame with a vectorized sort_values.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns = []
+        self.frames = []
+        self.offsets = []  # first row of each frame
+        self.rows = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        import pandas as pd
+        chunk = bisect.bisect_right(self.offsets, index.row()) - 1
+        value = self.frames[chunk].iat[index.row() - self.offsets[chunk], index.column()]
+        return "" if pd.isna(value) else str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section]
+        return str(section + 1)
+
+    def append(self, frame):
+        if frame.empty:
+            return
+        if not self.columns:
+            self.beginResetModel()
+            self.columns = list(frame.columns)
+            self.endResetModel()
+        self.beginInsertRows(QModelIndex(), self.rows, self.rows + len(frame) - 1)
+        self.frames.append(frame.reset_index(drop=True))
+        self.offsets.append(self.rows)
+        self.rows += len(frame)
+        self.endInsertRows()
+
+    def clear(self):
+        self.load([])
+
+    def load(self, frames):
+        self.beginResetModel()
+        self.columns = list(frames[0].columns) if frames else []
+        self.frames = list(frames)
+        self.offsets, self.rows = [], 0
+        for frame in self.frames:
+            self.offsets.append(self.rows)
+            self.rows += len(frame)
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column < 0 or not self.frames:
+            return
+        import pandas as pd
+        self.layoutAboutToBeChanged.emit()
+        frame = pd.concat(self.frames, ignore_index=True) if len(self.frames) > 1 else self.frames[0]
+        frame = frame.sort_values(self.columns[column], ascending=order == Qt.AscendingOrder, kind="stable",
+                                  na_position="last")
+        self.frames, self.offsets = [frame.reset_index(drop=True)], [0]
+        self.layoutChanged.emit()
+
+class ColumnStore:
+    """One table's rows as NumPy columns, sorted by id.
+
+    The first sync reads every row; later ones read only the rows whose
+    updated_at is past the last sync (less REPORT_REFRESH_OVERLAP) and merge
+    them in by id, so a long history crosses the network once.
+    """
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = columns  # (SQL expression, dtype) per column
+        self.ids = None
+        self.data = None
+        self.synced_until = None
+
+    def sync(self, conn, now):
+        import numpy as np
+        if self.ids is None:
+            self.ids = np.empty(0, dtype=np.int64)
+            self.data = [np.empty(0, dtype=dtype) for _, dtype in self.columns]
+        query = f"SELECT id, {', '.join(expression for expression, _ in self.columns)} FROM {self.table}"
+        params = ()
+        if self.synced_until is not None:
+            query += " WHERE updated_at >= %s"
+            params = (self.synced_until - timedelta(seconds=REPORT_REFRESH_OVERLAP),)
+        id_chunks, data_chunks = [], [[] for _ in self.columns]
+        for _, rows in stream_query(conn, query + " ORDER BY id", params, ANALYTICS_CHUNK_ROWS):
+            values = list(zip(*rows))
+            id_chunks.append(np.array(values[0], dtype=np.int64))
+            for chunks, column, (_, dtype) in zip(data_chunks, values[1:], self.columns):
+                chunks.append(np.array(column, dtype=dtype))
+        self.synced_until = now
+        if id_chunks:
+            self.merge(np.concatenate(id_chunks), [np.concatenate(chunks) for chunks in data_chunks])
+
+    def merge(self, ids, data):
+        import numpy as np
+        positions = np.searchsorted(self.ids, ids)
+        found = positions < len(self.ids)
+        found[found] = self.ids[positions[found]] == ids[found]
+        for column, values in zip(self.data, data):
+            column[positions[found]] = values[found]
+        new = ~found
+        if new.any():
+            self.ids = np.concatenate([self.ids, ids[new]])
+            self.data = [np.concatenate([column, values[new]]) for column, values in zip(self.data, data)]
+            if (np.diff(self.ids) < 0).any():
+                order = np.argsort(self.ids, kind="stable")
+                self.ids = self.ids[order]
+                self.data = [column[order] for column in self.data]
+
+class CirculationStats:
+    """Dashboard statistics computed with vectorized NumPy/pandas operations.
+
+    The loan history and the catalog's titles are held as ColumnStores and
+    kept current incrementally. The summary is recomputed only when the data
+    version has moved since the last one.
+    """
+
+    def __init__(self):
+        self.loans = ColumnStore("transactions", [
+            ("COALESCE(user_id, 0)", "int64"),
+            ("COALESCE(book_id, 0)", "int64"),
+            ("issue_date", "datetime64[D]"),
+            ("return_date", "datetime64[D]"),
+        ])
+        self.books = ColumnStore("books", [("title", object)])
+        self.version = None
+        self.summary = None
+
+    def sync(self, conn):
+        version = read_data_version(conn)
+        if version == self.version:
+            return self.summary
+        cursor = conn.cursor()
+        cursor.execute("SELECT NOW()")
+        now = cursor.fetchone()[0]
+        cursor.close()
+        self.loans.sync(conn, now)
+        self.books.sync(conn, now)
+        self.summary = self.summarize(conn)
+        self.version = version
+        return self.summary
+
+    def summarize(self, conn):
+        import numpy as np
+        import pandas as pd
+        user_ids, book_ids, issued, returned = self.loans.data
+        valid = ~np.isnat(issued)
+        user_ids, book_ids, issued, returned = user_ids[valid], book_ids[valid], issued[valid], returned[valid]
+        closed = ~np.isnat(returned)
+        summary = {"loans": len(issued), "open": int((~closed).sum()), "durations": None, "weekdays": None,
+                   "busiest_days": [], "top_titles": [], "member_rates": None, "top_members": []}
+        if not len(issued):
+            return summary
+
+        durations = (returned[closed] - issued[closed]).astype(np.int64)
+        if len(durations):
+            counts = np.histogram(durations, bins=[-np.inf] + [bound for bound, _ in LOAN_DURATION_BUCKETS])[0]
+            summary["durations"] = (float(np.median(durations)), float(np.percentile(durations, 90)),
+                                    float(durations.mean()), counts.tolist())
+
+        day_numbers = issued.astype(np.int64)
+        # 1970-01-01 was a Thursday, so this makes Monday 0
+        summary["weekdays"] = np.bincount((day_numbers + 3) % 7, minlength=7).tolist()
+        first_day = day_numbers.min()
+        counts = np.bincount(day_numbers - first_day)
+        top = np.argsort(-counts, kind="stable")[:ANALYTICS_TOP_N]
+        summary["busiest_days"] = [(str(np.datetime64(int(first_day + i), "D")), int(counts[i])) for i in top if counts[i]]
+
+        # Copies of a title are counted together; books without a title share one row
+        per_book = np.bincount(book_ids, minlength=self.books.ids.max(initial=0) + 1)
+        title_codes, titles = pd.factorize(pd.Series(self.books.data[0]).fillna("(untitled)"))
+        per_title = np.bincount(title_codes, weights=per_book[self.books.ids], minlength=len(titles)).astype(np.int64)
+        top = np.argsort(-per_title, kind="stable")[:ANALYTICS_TOP_N]
+        summary["top_titles"] = [(titles[i], int(per_title[i])) for i in top if per_title[i]]
+
+        # Loans per 30 days since each member's first loan (counting at least 30 days)
+        first_loan = pd.Series(day_numbers).groupby(user_ids).min()
+        members = first_loan.index.to_numpy()
+        loans_per_member = np.bincount(user_ids)[members]
+        first_loan = first_loan.to_numpy()
+        today = np.datetime64(datetime.now().date(), "D").astype(np.int64)
+        rates = loans_per_member * 30 / np.maximum(today - first_loan + 1, 30)
+        summary["member_rates"] = (float(np.median(rates)), float(rates.mean()))
+        top = np.argsort(-rates, kind="stable")[:ANALYTICS_TOP_N]
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT id, name FROM users WHERE id IN ({', '.join(['%s'] * len(top))})",
+                       [int(members[i]) for i in top])
+        names = dict(cursor.fetchall())
+        cursor.close()
+        summary["top_members"] = [(names.get(int(members[i]), "?"), float(rates[i])) for i in top]
+        return summary
 
 class LibraryManagementSystem(QMainWindow):
     def __init__(self):
@@ -119,13 +2156,13 @@ class LibraryManagementSystem(QMainWindow):
                 padding: 5px;
                 font-size: 15pt;
             }
-            QTableWidget {
+            QTableView {
                 border: none;
                 border-radius: 5px;
                 font-size: 15pt;
                 background-color: white;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 12px;
             }
             QHeaderView::section {
@@ -149,18 +2186,25 @@ class LibraryManagementSystem(QMainWindow):
             }
         """)
 
-        # Database connection
-        try:
-            self.db = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="12345",
-                database="library_db"
-            )
-            self.create_tables()
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Error", f"Failed to connect to database: {err}")
-            sys.exit(1)
+        # Database connection pool; connecting and migrating happen on the
+        # runner so the login window is up before the database answers
+        self.db_pool = ConnectionPool(DB_CONFIG)
+        self.database_ready = False
+
+        # All queries go through the runner, off the GUI thread
+        self.runner = DatabaseRunner(self.db_pool, self)
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setMaximumWidth(200)
+        self.busy_bar.setTextVisible(False)
+        self.busy_bar.setVisible(False)
+        self.statusBar().addPermanentWidget(self.busy_bar)
+        self.runner.busy_changed.connect(self.busy_bar.setVisible)
+
+        # Fines are reassessed once the database is ready and then periodically in the background
+        self.overdue_timer = QTimer(self)
+        self.overdue_timer.setInterval(OVERDUE_JOB_INTERVAL_MS)
+        self.overdue_timer.timeout.connect(self.run_overdue_job)
 
         # Main layout
         self.central_widget = QWidget()
@@ -219,93 +2263,97 @@ class LibraryManagementSystem(QMainWindow):
         self.content_area = QStackedWidget()
         self.main_layout.addWidget(self.content_area)
 
-        # Pages
-        self.pages = {
-            "LoginPage": LoginPage(self),
-            "HomePage": HomePage(self),
-            "CreateUserPage": CreateUserPage(self),
-            "BookAuthorPage": BookAuthorPage(self),
-            "AssignReturnPage": AssignReturnPage(self),
-            "AdminPanelPage": AdminPanelPage(self),
-            "ReportPage": ReportPage(self)
+        # Pages are built the first time they are shown
+        self.page_factories = {
+            "LoginPage": LoginPage,
+            "HomePage": HomePage,
+            "CreateUserPage": CreateUserPage,
+            "BookAuthorPage": BookAuthorPage,
+            "AssignReturnPage": AssignReturnPage,
+            "AdminPanelPage": AdminPanelPage,
+            "ReportPage": ReportPage
         }
+        self.pages = {}
+        self.page_containers = {}
+        self.page_versions = {}  # data version each page was last refreshed at
+        self.dirty_pages = set()  # pages to refresh on their next visit whatever the version
 
-        for page in self.pages.values():
+        self.show_page("LoginPage")
+        self.runner.submit(prepare_schema, self.database_connected, key="startup", on_error=self.database_failed)
+
+    def database_connected(self, _):
+        self.database_ready = True
+        STARTUP_MARKS.append(("connect and check schema", time.perf_counter()))
+        self.page("LoginPage").set_ready(True)
+        self.overdue_timer.start()
+        self.run_overdue_job()
+
+    def database_failed(self, err):
+        message = str(err) if isinstance(err, LibraryError) else f"Failed to connect to database: {err}"
+        QMessageBox.critical(self, "Error", message)
+        QApplication.instance().exit(1)
+
+    def page(self, page_name):
+        if page_name not in self.pages:
+            page = self.page_factories[page_name](self)
             scroll = QScrollArea()
             scroll.setWidgetResizable(True)
             scroll.setWidget(page)
             self.content_area.addWidget(scroll)
-
-        self.show_page("LoginPage")
+            self.pages[page_name] = page
+            self.page_containers[page_name] = scroll
+        return self.pages[page_name]
 
     def show_page(self, page_name):
         try:
-            self.content_area.setCurrentWidget(self.content_area.widget(list(self.pages.keys()).index(page_name)))
-            if hasattr(self.pages[page_name], 'refresh'):
-                self.pages[page_name].refresh()
+            page = self.page(page_name)
+            self.content_area.setCurrentWidget(self.page_containers[page_name])
+            if hasattr(page, 'refresh'):
+                self.refresh_if_stale(page_name)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to show page: {e}")
 
+    def refresh_if_stale(self, page_name):
+        # Pages keep their state between visits; one small query tells whether anything changed since
+        def check_version(version):
+            if page_name in self.dirty_pages or self.page_versions.get(page_name) != version:
+                self.dirty_pages.discard(page_name)
+                self.page_versions[page_name] = version
+                self.pages[page_name].refresh()
+
+        self.runner.submit(read_data_version, check_version, "Failed to check for changes", key="page_version")
+
+    def mark_dirty(self, *page_names):
+        """Have the given pages (all built pages by default) refresh on their next visit."""
+        self.dirty_pages.update(page_names or self.pages)
+
     def logout(self):
         self.sidebar.setVisible(False)
+        # The next user starts from fresh pages rather than this one's searches and selections
+        self.mark_dirty()
         self.show_page("LoginPage")
 
-    def create_tables(self):
-        cursor = self.db.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                name VARCHAR(255),
-                serial_number VARCHAR(255) UNIQUE,
-                phone_number VARCHAR(20),
-                address TEXT,
-                password VARCHAR(255),
-                is_admin BOOLEAN DEFAULT FALSE
-            )
-        """)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS authors (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                name VARCHAR(255) UNIQUE,
-                details TEXT
-            )
-        """)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS books (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                serial_number VARCHAR(255) UNIQUE,
-                title VARCHAR(255),
-                author_id INT,
-                location TEXT,
-                FOREIGN KEY (author_id) REFERENCES authors(id)
-            )
-        """)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id INT,
-                book_id INT,
-                issue_date DATE,
-                return_date DATE,
-                FOREIGN KEY (user_id) REFERENCES users(id),
-                FOREIGN KEY (book_id) REFERENCES books(id)
-            )
-        """)
-        cursor.execute("SELECT * FROM users WHERE name='admin'")
-        if not cursor.fetchone():
-            cursor.execute("""
-                INSERT INTO users (name, serial_number, password, is_admin)
-                VALUES (%s, %s, %s, %s)
-            """, ("admin", "0000", "admin", True))
-        self.db.commit()
-        cursor.close()
+    def run_overdue_job(self):
+        def show_overdue(overdue):
+            count, total = overdue
+            if count:
+                self.statusBar().showMessage(f"{count} overdue loans, {total:.2f} in outstanding fines")
+            else:
+                self.statusBar().clearMessage()
+
+        self.runner.submit(lambda conn: assess_fines(conn, datetime.now().date()), show_overdue,
+                           "Failed to assess fines", key="overdue_job")
 
     def closeEvent(self, event):
-        if hasattr(self, 'db') and self.db.is_connected():
-            self.db.close()
+        if hasattr(self, 'runner'):
+            self.runner.wait()
+        if hasattr(self, 'db_pool'):
+            self.db_pool.close()
         event.accept()
 
 class LoginPage(QWidget):
+    logo_loaded = pyqtSignal(QImage)
+
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
@@ -315,17 +2363,18 @@ class LoginPage(QWidget):
 
         # Logo
         logo_path = os.path.join(os.path.dirname(__file__), "logo.png")
+        logo_label = QLabel("CBCA Library")
+        logo_label.setFont(QFont("Helvetica, Arial, sans-serif", 40, QFont.Bold))
+        logo_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(logo_label)
         if os.path.exists(logo_path):
-            pixmap = QPixmap(logo_path).scaled(300, 300, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            logo_label = QLabel()
-            logo_label.setPixmap(pixmap)
-            logo_label.setAlignment(Qt.AlignCenter)
-            layout.addWidget(logo_label)
-        else:
-            logo_label = QLabel("CBCA Library")
-            logo_label.setFont(QFont("Helvetica, Arial, sans-serif", 40, QFont.Bold))
-            logo_label.setAlignment(Qt.AlignCenter)
-            layout.addWidget(logo_label)
+            # The logo is a multi-megapixel JPEG that takes a good part of a second to decode, so it is
+            # decoded off the GUI thread and replaces the name once ready
+            reader = QImageReader(logo_path)
+            reader.setScaledSize(reader.size().scaled(300, 300, Qt.KeepAspectRatio))
+            logo_label.setMinimumHeight(reader.scaledSize().height())
+            self.logo_loaded.connect(lambda image: logo_label.setPixmap(QPixmap.fromImage(image)))
+            threading.Thread(target=lambda: self.logo_loaded.emit(reader.read()), daemon=True).start()
 
         # Login card
         frame = QFrame()
@@ -350,29 +2399,39 @@ class LoginPage(QWidget):
         self.password.setMinimumHeight(50)
         frame_layout.addWidget(self.password)
 
-        login_btn = QPushButton("Login")
-        login_btn.setMinimumHeight(50)
-        login_btn.clicked.connect(self.login)
-        frame_layout.addWidget(login_btn)
+        self.login_btn = QPushButton("Login")
+        self.login_btn.setMinimumHeight(50)
+        self.login_btn.clicked.connect(self.login)
+        frame_layout.addWidget(self.login_btn)
+        self.set_ready(controller.database_ready)
 
         layout.addStretch()
         layout.addWidget(frame, alignment=Qt.AlignCenter)
         layout.addStretch()
 
+    def set_ready(self, ready):
+        # Credentials can be typed while the database connects, but not submitted
+        self.login_btn.setEnabled(ready)
+        self.login_btn.setText("Login" if ready else "Connecting...")
+
     def login(self):
-        try:
-            username = self.username.text().strip()
-            password = self.password.text().strip()
+        username = self.username.text().strip()
+        password = self.password.text().strip()
 
-            if not username or not password:
-                QMessageBox.critical(self, "Error", "Please enter both username and password")
-                return
+        if not username or not password:
+            QMessageBox.critical(self, "Error", "Please enter both username and password")
+            return
+        if not self.controller.database_ready:
+            return
 
-            cursor = self.controller.db.cursor()
+        def check_credentials(conn):
+            cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE name=%s AND password=%s", (username, password))
             user = cursor.fetchone()
             cursor.close()
+            return user
 
+        def finish_login(user):
             if user:
                 self.controller.sidebar.setVisible(True)
                 self.controller.show_page("HomePage")
@@ -380,8 +2439,8 @@ class LoginPage(QWidget):
                 self.password.clear()
             else:
                 QMessageBox.critical(self, "Error", "Invalid credentials")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Login failed: {e}")
+
+        self.controller.runner.submit(check_credentials, finish_login, "Login failed", key="login")
 
 class HomePage(QWidget):
     def __init__(self, controller):
@@ -442,17 +2501,67 @@ class HomePage(QWidget):
             cards_layout.addWidget(card)
 
         layout.addLayout(cards_layout)
+
+        # Circulation statistics
+        self.stats = CirculationStats()
+        stats_layout = QHBoxLayout()
+        stats_layout.setSpacing(30)
+        self.stat_labels = {}
+        for name, heading in [("loans", "Loans"), ("days", "Busiest Days"), ("titles", "Most Borrowed"),
+                              ("members", "Borrowing Rates")]:
+            panel = QFrame()
+            panel_layout = QVBoxLayout(panel)
+            panel_layout.setAlignment(Qt.AlignTop)
+            heading_label = QLabel(heading)
+            heading_label.setFont(QFont("Helvetica, Arial, sans-serif", 16, QFont.Bold))
+            panel_layout.addWidget(heading_label)
+            self.stat_labels[name] = QLabel("Loading...")
+            self.stat_labels[name].setWordWrap(True)
+            panel_layout.addWidget(self.stat_labels[name])
+            stats_layout.addWidget(panel)
+        layout.addLayout(stats_layout)
         layout.addStretch()
 
     def refresh(self):
-        pass  # No data to refresh on HomePage, but included for consistency
+        self.controller.runner.submit(self.stats.sync, self.show_stats, "Failed to load statistics",
+                                      key="analytics")
+
+    def show_stats(self, summary):
+        lines = [f"{summary['loans']} loans, {summary['open']} still out"]
+        if summary["durations"]:
+            median, p90, mean, counts = summary["durations"]
+            lines.append(f"Returned after {median:g} days (median), {mean:.1f} on average, "
+                         f"{p90:g} for the slowest 10%")
+            lines += [f"{label}: {count}" for (_, label), count in zip(LOAN_DURATION_BUCKETS, counts)]
+        self.stat_labels["loans"].setText("\n".join(lines))
+
+        lines = []
+        if summary["weekdays"]:
+            weekdays = sorted(zip(summary["weekdays"], ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday",
+                                                       "Saturday", "Sunday"]), key=lambda item: -item[0])
+            lines.append("Busiest weekdays: " + ", ".join(f"{day} ({count})" for count, day in weekdays[:3]))
+        lines += [f"{day}: {count} loans" for day, count in summary["busiest_days"]]
+        self.stat_labels["days"].setText("\n".join(lines) or "No loans yet")
+
+        self.stat_labels["titles"].setText(
+            "\n".join(f"{title}: {count}" for title, count in summary["top_titles"]) or "No loans yet")
+
+        lines = []
+        if summary["member_rates"]:
+            median, mean = summary["member_rates"]
+            lines.append(f"Loans per member per month: {median:.1f} (median), {mean:.1f} on average")
+            lines += [f"{name}: {rate:.1f}" for name, rate in summary["top_members"]]
+        self.stat_labels["members"].setText("\n".join(lines) or "No loans yet")
 
 class CreateUserPage(QWidget):
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
-        self.current_page = 1
-        self.users_per_page = 10
+        self.users = PagedQuery(
+            "name, serial_number, phone_number, address, id", "users", "id",
+            TextSearch("id", ["name, serial_number"], [[0, 1]],
+                       "SELECT id, CONCAT_WS(' ', name, serial_number) FROM users"))
+        self.user_position = PagePosition()
         layout = QVBoxLayout(self)
         layout.setContentsMargins(50, 50, 50, 50)
         layout.setSpacing(30)
@@ -484,104 +2593,137 @@ class CreateUserPage(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search users...")
         self.search_input.setMinimumHeight(50)
-        self.search_input.textChanged.connect(self.search_users)
+        self.search_input.textChanged.connect(self.search_text_changed)
         layout.addWidget(self.search_input)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_users)
 
         # Users table
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(['Full Name', 'Serial Number', 'Phone Number', 'Address', 'Actions'])
+        self.table_model = RowsModel(['Full Name', 'Serial Number', 'Phone Number', 'Address'], "Update", self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(60)
         self.table.setAlternatingRowColors(True)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.cellDoubleClicked.connect(self.show_update_user_form)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
+        self.table.setMouseTracking(True)
+        update_delegate = ButtonDelegate(self.table)
+        update_delegate.clicked.connect(lambda row: self.show_update_user_form(row, 0))
+        self.table.setItemDelegateForColumn(4, update_delegate)
+        # The button column reports its own clicks, double-clicks included
+        self.table.doubleClicked.connect(
+            lambda index: index.column() != 4 and self.show_update_user_form(index.row(), index.column()))
         layout.addWidget(self.table)
 
         # Pagination
         pagination_frame = QFrame()
         pagination_layout = QHBoxLayout(pagination_frame)
-        prev_btn = QPushButton("Previous")
-        prev_btn.setMinimumHeight(50)
-        prev_btn.clicked.connect(self.prev_page)
-        pagination_layout.addWidget(prev_btn)
+        self.prev_btn = QPushButton("Previous")
+        self.prev_btn.setMinimumHeight(50)
+        self.prev_btn.clicked.connect(self.prev_page)
+        pagination_layout.addWidget(self.prev_btn)
 
         self.page_label = QLabel("Page 1 of 1")
         pagination_layout.addWidget(self.page_label)
 
-        next_btn = QPushButton("Next")
-        next_btn.setMinimumHeight(50)
-        next_btn.clicked.connect(self.next_page)
-        pagination_layout.addWidget(next_btn)
+        self.page_jump = QLineEdit()
+        self.page_jump.setPlaceholderText("Go to page")
+        self.page_jump.setFixedWidth(160)
+        self.page_jump.setMinimumHeight(50)
+        self.page_jump.returnPressed.connect(self.goto_page)
+        pagination_layout.addWidget(self.page_jump)
+
+        self.next_btn = QPushButton("Next")
+        self.next_btn.setMinimumHeight(50)
+        self.next_btn.clicked.connect(self.next_page)
+        pagination_layout.addWidget(self.next_btn)
+
+        self.page_size_box = QComboBox()
+        for size in PAGE_SIZES:
+            self.page_size_box.addItem(f"{size} per page", size)
+        self.page_size_box.addItem("Scroll", 0)
+        self.page_size_box.setMinimumHeight(50)
+        self.page_size_box.currentIndexChanged.connect(self.change_page_size)
+        pagination_layout.addWidget(self.page_size_box)
 
         layout.addWidget(pagination_frame)
-
-        self.refresh()
+        self.scroll = InfiniteScroll(self.table, self.table_model, self.users, self.controller.runner, "users",
+                                     self.page_label, "Failed to load users")
 
     def refresh(self):
-        self.current_page = 1
+        self.search_timer.stop()
+        self.users.invalidate()
+        self.user_position.reset()
+        self.search_input.blockSignals(True)
         self.search_input.clear()
+        self.search_input.blockSignals(False)
         self.load_users()
 
-    def load_users(self, search_term=""):
-        try:
-            self.table.setRowCount(0)
-            cursor = self.controller.db.cursor()
-            query = "SELECT name, serial_number, phone_number, address FROM users"
-            params = ()
-            if search_term:
-                query += " WHERE name LIKE %s OR serial_number LIKE %s"
-                params = (f"%{search_term}%", f"%{search_term}%")
+    def load_users(self, direction=None):
+        if self.scroll.enabled:
+            self.scroll.start(self.user_position.search_term)
+            return
 
-            cursor.execute(query, params)
-            users = cursor.fetchall()
+        paged, position = self.users, self.user_position.request()
 
-            # Calculate total pages
-            total_users = len(users)
-            total_pages = max(1, (total_users + self.users_per_page - 1) // self.users_per_page)
+        def fetch_users(conn):
+            cursor = conn.cursor()
+            users = paged.fetch(cursor, position, direction)
+            cursor.close()
+            return users, paged.page_count()
 
-            start = (self.current_page - 1) * self.users_per_page
-            end = start + self.users_per_page
-            self.table.setRowCount(min(self.users_per_page, len(users[start:end])))
+        self.controller.runner.submit(fetch_users, self.show_users, "Failed to load users", key="users")
 
-            for row_idx, user in enumerate(users[start:end]):
-                for col_idx, value in enumerate(user):
-                    self.table.setItem(row_idx, col_idx, QTableWidgetItem(str(value) if value else ''))
-                update_btn = QPushButton("Update")
-                update_btn.setObjectName("updateButton")
-                update_btn.clicked.connect(lambda _, r=row_idx: self.show_update_user_form(r, 0))
-                self.table.setCellWidget(row_idx, 4, update_btn)
+    def show_users(self, result):
+        try:
+            users, self.user_position.page_count = result
+            self.table_model.set_rows(users)
 
-            self.page_label.setText(f"Page {self.current_page} of {total_pages}")
-            cursor.close()
+            self.page_label.setText(f"Page {self.user_position.page} of {self.user_position.page_count}")
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load users: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to show users: {e}")
+
+    def search_text_changed(self):
+        # Whatever is in flight is for an older term; search once typing pauses
+        self.controller.runner.cancel("users")
+        self.search_timer.start()
 
     def search_users(self):
-        self.current_page = 1
-        self.load_users(self.search_input.text())
+        self.user_position.reset(self.search_input.text())
+        self.load_users()
 
     def prev_page(self):
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.load_users(self.search_input.text())
+        if self.user_position.prev_page():
+            self.load_users("prev")
 
     def next_page(self):
+        if self.user_position.next_page():
+            self.load_users("next")
+
+    def goto_page(self):
         try:
-            cursor = self.controller.db.cursor()
-            query = "SELECT COUNT(*) FROM users"
-            if self.search_input.text():
-                query += " WHERE name LIKE %s OR serial_number LIKE %s"
-                cursor.execute(query, (f"%{self.search_input.text()}%", f"%{self.search_input.text()}%"))
-            else:
-                cursor.execute(query)
-            total_users = cursor.fetchone()[0]
-            cursor.close()
-            total_pages = max(1, (total_users + self.users_per_page - 1) // self.users_per_page)
-            if self.current_page < total_pages:
-                self.current_page += 1
-                self.load_users(self.search_input.text())
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to navigate: {e}")
+            page = int(self.page_jump.text())
+        except ValueError:
+            QMessageBox.critical(self, "Error", "Please enter a page number")
+            return
+        self.page_jump.clear()
+        self.user_position.goto_page(page)
+        self.load_users()
+
+    def change_page_size(self):
+        size = self.page_size_box.currentData()
+        for widget in (self.prev_btn, self.next_btn, self.page_jump):
+            widget.setVisible(bool(size))
+        if size:
+            self.scroll.stop()
+            self.user_position.set_page_size(size)
+        else:
+            self.scroll.enabled = True
+        self.load_users()
 
     def show_create_form(self):
         dialog = QDialog(self.controller)
@@ -640,17 +2782,25 @@ class CreateUserPage(QWidget):
         dialog.exec_()
 
     def show_update_user_form(self, row, col):
-        try:
-            serial_number = self.table.item(row, 1).text() if self.table.item(row, 1) else ""
-            if not serial_number:
-                QMessageBox.critical(self, "Error", "No serial number found for this user")
-                return
-
-            cursor = self.controller.db.cursor()
+        key = self.table_model.key(row)
+        serial_number = self.table_model.value(row, 1)
+        if not serial_number:
+            QMessageBox.critical(self, "Error", "No serial number found for this user")
+            return
+
+        def fetch_user(conn):
+            cursor = conn.cursor()
             cursor.execute("SELECT name, serial_number, phone_number, address FROM users WHERE serial_number=%s", (serial_number,))
             user = cursor.fetchone()
             cursor.close()
+            return user
+
+        # Keyed so repeated clicks open one dialog, for the last row clicked
+        self.controller.runner.submit(fetch_user, lambda user: self.open_update_user_form(key, user),
+                                      "Failed to load user data", key="edit_user")
 
+    def open_update_user_form(self, key, user):
+        try:
             if not user:
                 QMessageBox.critical(self, "Error", "User not found")
                 return
@@ -693,7 +2843,7 @@ class CreateUserPage(QWidget):
 
             update_btn = QPushButton("Update")
             update_btn.setObjectName("updateButton")
-            update_btn.clicked.connect(lambda: self.update_user(user[1], name.text(), serial.text(), phone.text(), address.toPlainText(), dialog))
+            update_btn.clicked.connect(lambda: self.update_user(key, user[1], name.text(), serial.text(), phone.text(), address.toPlainText(), dialog))
             frame_layout.addWidget(update_btn)
 
             layout.addWidget(frame)
@@ -702,63 +2852,79 @@ class CreateUserPage(QWidget):
             QMessageBox.critical(self, "Error", f"Failed to load user data: {e}")
 
     def submit_user(self, name, serial, phone, address, dialog):
-        try:
-            if not name or not serial:
-                QMessageBox.critical(self, "Error", "Name and serial number are required")
-                return
+        if not name or not serial:
+            QMessageBox.critical(self, "Error", "Name and serial number are required")
+            return
 
-            cursor = self.controller.db.cursor()
+        def insert_user(conn):
+            import uuid
+            cursor = conn.cursor()
             cursor.execute("SELECT id FROM users WHERE serial_number=%s", (serial,))
             if cursor.fetchone():
                 cursor.close()
-                QMessageBox.critical(self, "Error", "Serial number already exists")
-                return
+                raise LibraryError("Serial number already exists")
 
             cursor.execute("""
                 INSERT INTO users (name, serial_number, phone_number, address, password)
                 VALUES (%s, %s, %s, %s, %s)
             """, (name or None, serial, phone or None, address or None, str(uuid.uuid4())[:8]))
-            self.controller.db.commit()
+            conn.commit()
             cursor.close()
+
+        def user_created(_):
             QMessageBox.information(self, "Success", "User created successfully")
             self.refresh()
             dialog.accept()
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Error", f"Database error: {err}")
 
-    def update_user(self, old_serial, name, serial, phone, address, dialog):
-        try:
-            if not name or not serial:
-                QMessageBox.critical(self, "Error", "Name and serial number are required")
-                return
+        self.controller.runner.submit(insert_user, user_created, "Failed to create user")
+
+    def update_user(self, key, old_serial, name, serial, phone, address, dialog):
+        if not name or not serial:
+            QMessageBox.critical(self, "Error", "Name and serial number are required")
+            return
 
-            cursor = self.controller.db.cursor()
+        def save_user(conn):
+            cursor = conn.cursor()
             if serial != old_serial:
                 cursor.execute("SELECT id FROM users WHERE serial_number=%s", (serial,))
                 if cursor.fetchone():
                     cursor.close()
-                    QMessageBox.critical(self, "Error", "Serial number already exists")
-                    return
+                    raise LibraryError("Serial number already exists")
 
             cursor.execute("""
                 UPDATE users 
                 SET name=%s, serial_number=%s, phone_number=%s, address=%s
                 WHERE serial_number=%s
             """, (name or None, serial, phone or None, address or None, old_serial))
-            self.controller.db.commit()
+            conn.commit()
             cursor.close()
+
+        def user_updated(_):
             QMessageBox.information(self, "Success", "User updated successfully")
-            self.refresh()
+            # Only the edited row changes; search and paging stay where they were
+            self.users.invalidate()
+            self.table_model.update_row(key, {0: name, 1: serial, 2: phone, 3: address})
             dialog.accept()
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Error", f"Database error: {err}")
+
+        self.controller.runner.submit(save_user, user_updated, "Failed to update user")
 
 class BookAuthorPage(QWidget):
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
-        self.current_page = 1
-        self.books_per_page = 10
+        self.books = PagedQuery(
+            """b.serial_number, a.name, b.title, b.serial_number,
+               COALESCE(u.name, 'Library') as occupied_by,
+               COALESCE(u.address, b.location) as location,
+               b.id""",
+            """books b
+               JOIN authors a ON b.author_id = a.id
+               LEFT JOIN users u ON b.current_user_id = u.id""",
+            "b.id",
+            TextSearch("b.id", ["b.title", "a.name"], [[2], [1]],
+                       "SELECT b.id, CONCAT_WS(' ', b.title, a.name) FROM books b JOIN authors a ON b.author_id = a.id"),
+            count_source="books b JOIN authors a ON b.author_id = a.id")
+        self.book_position = PagePosition()
         layout = QVBoxLayout(self)
         layout.setContentsMargins(50, 50, 50, 50)
         layout.setSpacing(30)
@@ -802,114 +2968,138 @@ class BookAuthorPage(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search books...")
         self.search_input.setMinimumHeight(50)
-        self.search_input.textChanged.connect(self.search_books)
+        self.search_input.textChanged.connect(self.search_text_changed)
         layout.addWidget(self.search_input)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_books)
 
         # Books table
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(['Serial', 'Author', 'Book Title', 'Book Serial', 'Occupied By', 'Location', 'Actions'])
+        self.table_model = RowsModel(['Serial', 'Author', 'Book Title', 'Book Serial', 'Occupied By', 'Location'],
+                                     "Update", self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(60)
         self.table.setAlternatingRowColors(True)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.cellDoubleClicked.connect(self.show_update_book_form)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
+        self.table.setMouseTracking(True)
+        update_delegate = ButtonDelegate(self.table)
+        update_delegate.clicked.connect(lambda row: self.show_update_book_form(row, 0))
+        self.table.setItemDelegateForColumn(6, update_delegate)
+        # The button column reports its own clicks, double-clicks included
+        self.table.doubleClicked.connect(
+            lambda index: index.column() != 6 and self.show_update_book_form(index.row(), index.column()))
         layout.addWidget(self.table)
 
         # Pagination
         pagination_frame = QFrame()
         pagination_layout = QHBoxLayout(pagination_frame)
-        prev_btn = QPushButton("Previous")
-        prev_btn.setMinimumHeight(50)
-        prev_btn.clicked.connect(self.prev_page)
-        pagination_layout.addWidget(prev_btn)
+        self.prev_btn = QPushButton("Previous")
+        self.prev_btn.setMinimumHeight(50)
+        self.prev_btn.clicked.connect(self.prev_page)
+        pagination_layout.addWidget(self.prev_btn)
 
         self.page_label = QLabel("Page 1 of 1")
         pagination_layout.addWidget(self.page_label)
 
-        next_btn = QPushButton("Next")
-        next_btn.setMinimumHeight(50)
-        next_btn.clicked.connect(self.next_page)
-        pagination_layout.addWidget(next_btn)
+        self.page_jump = QLineEdit()
+        self.page_jump.setPlaceholderText("Go to page")
+        self.page_jump.setFixedWidth(160)
+        self.page_jump.setMinimumHeight(50)
+        self.page_jump.returnPressed.connect(self.goto_page)
+        pagination_layout.addWidget(self.page_jump)
+
+        self.next_btn = QPushButton("Next")
+        self.next_btn.setMinimumHeight(50)
+        self.next_btn.clicked.connect(self.next_page)
+        pagination_layout.addWidget(self.next_btn)
+
+        self.page_size_box = QComboBox()
+        for size in PAGE_SIZES:
+            self.page_size_box.addItem(f"{size} per page", size)
+        self.page_size_box.addItem("Scroll", 0)
+        self.page_size_box.setMinimumHeight(50)
+        self.page_size_box.currentIndexChanged.connect(self.change_page_size)
+        pagination_layout.addWidget(self.page_size_box)
 
         layout.addWidget(pagination_frame)
-
-        self.refresh()
+        self.scroll = InfiniteScroll(self.table, self.table_model, self.books, self.controller.runner, "books",
+                                     self.page_label, "Failed to load books")
 
     def refresh(self):
-        self.current_page = 1
+        self.search_timer.stop()
+        self.books.invalidate()
+        self.book_position.reset()
+        self.search_input.blockSignals(True)
         self.search_input.clear()
+        self.search_input.blockSignals(False)
         self.load_books()
 
-    def load_books(self, search_term=""):
-        try:
-            self.table.setRowCount(0)
-            cursor = self.controller.db.cursor()
-            query = """
-                SELECT b.serial_number, a.name, b.title, b.serial_number, 
-                       COALESCE(u.name, 'Library') as occupied_by,
-                       COALESCE(u.address, b.location) as location,
-                       b.id
-                FROM books b
-                JOIN authors a ON b.author_id = a.id
-                LEFT JOIN transactions t ON b.id = t.book_id AND t.return_date IS NULL
-                LEFT JOIN users u ON t.user_id = u.id
-            """
-            params = ""
-            if search_term:
-                query += " WHERE b.title LIKE %s OR a.name LIKE %s"
-                params = (f"%{search_term}%", f"%{search_term}%")
+    def load_books(self, direction=None):
+        if self.scroll.enabled:
+            self.scroll.start(self.book_position.search_term)
+            return
 
-            cursor.execute(query, params)
-            books = cursor.fetchall()
+        paged, position = self.books, self.book_position.request()
 
-            # Calculate total pages
-            total_books = len(books)
-            total_pages = max(1, (total_books + self.books_per_page - 1) // self.books_per_page)
+        def fetch_books(conn):
+            cursor = conn.cursor()
+            books = paged.fetch(cursor, position, direction)
+            cursor.close()
+            return books, paged.page_count()
 
-            start = (self.current_page - 1) * self.books_per_page
-            end = start + self.books_per_page
-            self.table.setRowCount(min(self.books_per_page, len(books[start:end])))
+        self.controller.runner.submit(fetch_books, self.show_books, "Failed to load books", key="books")
 
-            for row_idx, book in enumerate(books[start:end]):
-                for col_idx, value in enumerate(book[:-1]):  # Exclude book_id from display
-                    self.table.setItem(row_idx, col_idx, QTableWidgetItem(str(value) if value else ''))
-                # Add Update button
-                update_btn = QPushButton("Update")
-                update_btn.setObjectName("updateButton")
-                update_btn.clicked.connect(lambda _, r=row_idx: self.show_update_book_form(r, 0))
-                self.table.setCellWidget(row_idx, 6, update_btn)
+    def show_books(self, result):
+        try:
+            books, self.book_position.page_count = result
+            self.table_model.set_rows(books)
 
-            self.page_label.setText(f"Page {self.current_page} of {total_pages}")
-            cursor.close()
+            self.page_label.setText(f"Page {self.book_position.page} of {self.book_position.page_count}")
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load books: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to show books: {e}")
+
+    def search_text_changed(self):
+        # Whatever is in flight is for an older term; search once typing pauses
+        self.controller.runner.cancel("books")
+        self.search_timer.start()
 
     def search_books(self):
-        self.current_page = 1
-        self.load_books(self.search_input.text())
+        self.book_position.reset(self.search_input.text())
+        self.load_books()
 
     def prev_page(self):
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.load_books(self.search_input.text())
+        if self.book_position.prev_page():
+            self.load_books("prev")
 
     def next_page(self):
+        if self.book_position.next_page():
+            self.load_books("next")
+
+    def goto_page(self):
         try:
-            cursor = self.controller.db.cursor()
-            query = "SELECT COUNT(*) FROM books"
-            if self.search_input.text():
-                query += " WHERE title LIKE %s OR author_id IN (SELECT id FROM authors WHERE name LIKE %s)"
-                cursor.execute(query, (f"%{self.search_input.text()}%", f"%{self.search_input.text()}%"))
-            else:
-                cursor.execute(query)
-            total_books = cursor.fetchone()[0]
-            cursor.close()
-            total_pages = max(1, (total_books + self.books_per_page - 1) // self.books_per_page)
-            if self.current_page < total_pages:
-                self.current_page += 1
-                self.load_books(self.search_input.text())
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to navigate: {e}")
+            page = int(self.page_jump.text())
+        except ValueError:
+            QMessageBox.critical(self, "Error", "Please enter a page number")
+            return
+        self.page_jump.clear()
+        self.book_position.goto_page(page)
+        self.load_books()
+
+    def change_page_size(self):
+        size = self.page_size_box.currentData()
+        for widget in (self.prev_btn, self.next_btn, self.page_jump):
+            widget.setVisible(bool(size))
+        if size:
+            self.scroll.stop()
+            self.book_position.set_page_size(size)
+        else:
+            self.scroll.enabled = True
+        self.load_books()
 
     def show_view_authors(self):
         dialog = QDialog(self.controller)
@@ -932,7 +3122,11 @@ class BookAuthorPage(QWidget):
         self.author_search_input = QLineEdit()
         self.author_search_input.setPlaceholderText("Search authors...")
         self.author_search_input.setMinimumHeight(50)
-        self.author_search_input.textChanged.connect(lambda: self.load_authors(dialog))
+        author_search_timer = QTimer(dialog)
+        author_search_timer.setSingleShot(True)
+        author_search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        author_search_timer.timeout.connect(lambda: self.search_authors(dialog))
+        self.author_search_input.textChanged.connect(lambda: author_search_timer.start())
         frame_layout.addWidget(self.author_search_input)
 
         # Authors table
@@ -981,67 +3175,62 @@ class BookAuthorPage(QWidget):
         next_btn.clicked.connect(lambda: self.next_author_page(dialog))
         pagination_layout.addWidget(next_btn)
 
+        page_size_box = QComboBox()
+        for size in PAGE_SIZES:
+            page_size_box.addItem(f"{size} per page", size)
+        page_size_box.setMinimumHeight(50)
+        page_size_box.currentIndexChanged.connect(
+            lambda: self.change_author_page_size(dialog, page_size_box.currentData()))
+        pagination_layout.addWidget(page_size_box)
+
         frame_layout.addWidget(pagination_frame)
 
         layout.addWidget(frame)
-        self.current_author_page = 1
-        self.authors_per_page = 10
+        self.authors = PagedQuery("name, details, id", "authors", "id",
+                                  TextSearch("id", ["name"], [[0]], "SELECT id, name FROM authors"))
+        self.author_position = PagePosition()
         self.load_authors(dialog)
         dialog.exec_()
 
-    def load_authors(self, dialog):
-        try:
-            self.authors_table.setRowCount(0)
-            cursor = self.controller.db.cursor()
-            query = "SELECT name, details FROM authors"
-            params = ""
-            search_term = self.author_search_input.text().strip()
-            if search_term:
-                query += " WHERE name LIKE %s"
-                params = (f"%{search_term}%",)
-
-            cursor.execute(query, params)
-            authors = cursor.fetchall()
+    def load_authors(self, dialog, direction=None):
+        paged, position = self.authors, self.author_position.request()
 
-            # Calculate total pages
-            total_authors = len(authors)
-            total_pages = max(1, (total_authors + self.authors_per_page - 1) // self.authors_per_page)
+        def fetch_authors(conn):
+            cursor = conn.cursor()
+            authors = paged.fetch(cursor, position, direction)
+            cursor.close()
+            return authors, paged.page_count()
 
-            start = (self.current_author_page - 1) * self.authors_per_page
-            end = start + self.authors_per_page
-            self.authors_table.setRowCount(min(self.authors_per_page, len(authors[start:end])))
+        self.controller.runner.submit(fetch_authors, self.show_authors, "Failed to load authors", key="authors")
 
-            for row_idx, author in enumerate(authors[start:end]):
+    def show_authors(self, result):
+        try:
+            authors, self.author_position.page_count = result
+            self.authors_table.setRowCount(0)
+            self.authors_table.setRowCount(len(authors))
+            for row_idx, author in enumerate(authors):
                 self.authors_table.setItem(row_idx, 0, QTableWidgetItem(author[0] if author[0] else ''))
                 self.authors_table.setItem(row_idx, 1, QTableWidgetItem(author[1] if author[1] else ''))
 
-            self.author_page_label.setText(f"Page {self.current_author_page} of {total_pages}")
-            cursor.close()
+            self.author_page_label.setText(f"Page {self.author_position.page} of {self.author_position.page_count}")
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load authors: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to show authors: {e}")
+
+    def search_authors(self, dialog):
+        self.author_position.reset(self.author_search_input.text().strip())
+        self.load_authors(dialog)
 
     def prev_author_page(self, dialog):
-        if self.current_author_page > 1:
-            self.current_author_page -= 1
-            self.load_authors(dialog)
+        if self.author_position.prev_page():
+            self.load_authors(dialog, "prev")
 
     def next_author_page(self, dialog):
-        try:
-            cursor = self.controller.db.cursor()
-            query = "SELECT COUNT(*) FROM authors"
-            if self.author_search_input.text():
-                query += " WHERE name LIKE %s"
-                cursor.execute(query, (f"%{self.author_search_input.text()}%",))
-            else:
-                cursor.execute(query)
-            total_authors = cursor.fetchone()[0]
-            cursor.close()
-            total_pages = max(1, (total_authors + self.authors_per_page - 1) // self.authors_per_page)
-            if self.current_author_page < total_pages:
-                self.current_author_page += 1
-                self.load_authors(dialog)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to navigate: {e}")
+        if self.author_position.next_page():
+            self.load_authors(dialog, "next")
+
+    def change_author_page_size(self, dialog, size):
+        self.author_position.set_page_size(size)
+        self.load_authors(dialog)
 
     def show_add_author_form(self):
         dialog = QDialog(self.controller)
@@ -1159,24 +3348,32 @@ class BookAuthorPage(QWidget):
         dialog.exec_()
 
     def show_update_book_form(self, row, col):
-        try:
-            serial_number = self.table.item(row, 3).text() if self.table.item(row, 3) else ""
-            if not serial_number:
-                QMessageBox.critical(self, "Error", "No serial number found for this book")
-                return
-
-            cursor = self.controller.db.cursor()
+        key = self.table_model.key(row)
+        shown_location = self.table_model.value(row, 5) or ""
+        serial_number = self.table_model.value(row, 3)
+        if not serial_number:
+            QMessageBox.critical(self, "Error", "No serial number found for this book")
+            return
+
+        def fetch_book(conn):
+            cursor = conn.cursor()
             cursor.execute("""
                 SELECT b.title, b.serial_number, b.location, a.name, COALESCE(u.name, 'Library') as occupied_by
                 FROM books b
                 JOIN authors a ON b.author_id = a.id
-                LEFT JOIN transactions t ON b.id = t.book_id AND t.return_date IS NULL
-                LEFT JOIN users u ON t.user_id = u.id
+                LEFT JOIN users u ON b.current_user_id = u.id
                 WHERE b.serial_number=%s
             """, (serial_number,))
             book = cursor.fetchone()
             cursor.close()
+            return book
 
+        # Keyed so repeated clicks open one dialog, for the last row clicked
+        self.controller.runner.submit(fetch_book, lambda book: self.open_update_book_form(key, shown_location, book),
+                                      "Failed to load book data", key="edit_book")
+
+    def open_update_book_form(self, key, shown_location, book):
+        try:
             if not book:
                 QMessageBox.critical(self, "Error", "Book not found")
                 return
@@ -1230,7 +3427,8 @@ class BookAuthorPage(QWidget):
 
             update_btn = QPushButton("Update")
             update_btn.setObjectName("updateButton")
-            update_btn.clicked.connect(lambda: self.update_book(book[1], book_title.text(), book_serial.text(), book_location.text(), book[4], dialog))
+            update_btn.clicked.connect(lambda: self.update_book(key, shown_location, book[1], book_title.text(), book_serial.text(),
+                                                                book_location.text(), book[4], dialog))
             frame_layout.addWidget(update_btn)
 
             layout.addWidget(frame)
@@ -1239,70 +3437,75 @@ class BookAuthorPage(QWidget):
             QMessageBox.critical(self, "Error", f"Failed to load book data: {e}")
 
     def refresh_authors(self):
-        try:
-            self.author_dropdown.clear()
-            cursor = self.controller.db.cursor()
+        def fetch_author_names(conn):
+            cursor = conn.cursor()
             cursor.execute("SELECT name FROM authors")
             authors = [row[0] for row in cursor.fetchall()]
-            self.author_dropdown.addItems(authors)
             cursor.close()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to refresh authors: {e}")
+            return authors
+
+        def fill_dropdown(authors):
+            self.author_dropdown.clear()
+            self.author_dropdown.addItems(authors)
+
+        self.controller.runner.submit(fetch_author_names, fill_dropdown, "Failed to refresh authors",
+                                      key="author_names")
 
     def add_author(self, dialog):
-        try:
-            name = self.author_name.text().strip()
-            details = self.author_details.toPlainText().strip()
+        name = self.author_name.text().strip()
+        details = self.author_details.toPlainText().strip()
 
-            if not name:
-                QMessageBox.critical(self, "Error", "Author name is required")
-                return
+        if not name:
+            QMessageBox.critical(self, "Error", "Author name is required")
+            return
 
-            cursor = self.controller.db.cursor()
+        def insert_author(conn):
+            cursor = conn.cursor()
             cursor.execute("INSERT INTO authors (name, details) VALUES (%s, %s)", (name or None, details or None))
-            self.controller.db.commit()
+            conn.commit()
             cursor.close()
+
+        def author_added(_):
             QMessageBox.information(self, "Success", "Author added successfully")
             self.author_name.clear()
             self.author_details.clear()
-            self.refresh_authors()
             dialog.accept()
             self.refresh()
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Error", f"Database error: {err}")
+
+        self.controller.runner.submit(insert_author, author_added, "Failed to add author")
 
     def add_book(self, dialog):
-        try:
-            author_name = self.author_dropdown.currentText()
-            title = self.book_title.text().strip()
-            serial = self.book_serial.text().strip()
-            location = self.book_location.text().strip()
+        author_name = self.author_dropdown.currentText()
+        title = self.book_title.text().strip()
+        serial = self.book_serial.text().strip()
+        location = self.book_location.text().strip()
 
-            if not all([author_name, title, serial]):
-                QMessageBox.critical(self, "Error", "Author, title, and serial are required")
-                return
+        if not all([author_name, title, serial]):
+            QMessageBox.critical(self, "Error", "Author, title, and serial are required")
+            return
 
-            cursor = self.controller.db.cursor()
+        def insert_book(conn):
+            cursor = conn.cursor()
             cursor.execute("SELECT id FROM authors WHERE name=%s", (author_name,))
             result = cursor.fetchone()
             if not result:
-                QMessageBox.critical(self, "Error", "Author not found")
                 cursor.close()
-                return
+                raise LibraryError("Author not found")
             author_id = result[0]
 
             cursor.execute("SELECT id FROM books WHERE serial_number=%s", (serial,))
             if cursor.fetchone():
                 cursor.close()
-                QMessageBox.critical(self, "Error", "Book serial number already exists")
-                return
+                raise LibraryError("Book serial number already exists")
 
             cursor.execute("""
                 INSERT INTO books (serial_number, title, author_id, location)
                 VALUES (%s, %s, %s, %s)
             """, (serial, title, author_id, location or None))
-            self.controller.db.commit()
+            conn.commit()
             cursor.close()
+
+        def book_added(_):
             QMessageBox.information(self, "Success", "Book added successfully")
             self.book_title.clear()
             self.book_serial.clear()
@@ -1310,39 +3513,45 @@ class BookAuthorPage(QWidget):
             self.author_dropdown.setCurrentIndex(-1)
             dialog.accept()
             self.refresh()
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Error", f"Database error: {err}")
 
-    def update_book(self, old_serial, title, serial, location, occupied_by, dialog):
-        try:
-            if not title or not serial:
-                QMessageBox.critical(self, "Error", "Title and serial number are required")
-                return
+        self.controller.runner.submit(insert_book, book_added, "Failed to add book")
 
-            if occupied_by != "Library" and location != self.table.item(self.table.currentRow(), 5).text():
-                QMessageBox.critical(self, "Error", "Location can only be updated when book is in Library")
-                return
+    def update_book(self, key, shown_location, old_serial, title, serial, location, occupied_by, dialog):
+        if not title or not serial:
+            QMessageBox.critical(self, "Error", "Title and serial number are required")
+            return
+
+        if occupied_by != "Library" and location != shown_location:
+            QMessageBox.critical(self, "Error", "Location can only be updated when book is in Library")
+            return
 
-            cursor = self.controller.db.cursor()
+        def save_book(conn):
+            cursor = conn.cursor()
             if serial != old_serial:
                 cursor.execute("SELECT id FROM books WHERE serial_number=%s", (serial,))
                 if cursor.fetchone():
                     cursor.close()
-                    QMessageBox.critical(self, "Error", "Book serial number already exists")
-                    return
+                    raise LibraryError("Book serial number already exists")
 
             cursor.execute("""
                 UPDATE books 
                 SET title=%s, serial_number=%s, location=%s
                 WHERE serial_number=%s
             """, (title, serial, location or None, old_serial))
-            self.controller.db.commit()
+            conn.commit()
             cursor.close()
+
+        def book_updated(_):
             QMessageBox.information(self, "Success", "Book updated successfully")
-            self.refresh()
+            # Only the edited row changes; search and paging stay where they were
+            self.books.invalidate()
+            changes = {0: serial, 2: title, 3: serial}
+            if occupied_by == "Library":
+                changes[5] = location
+            self.table_model.update_row(key, changes)
             dialog.accept()
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Error", f"Database error: {err}")
+
+        self.controller.runner.submit(save_book, book_updated, "Failed to update book")
 
 class AssignReturnPage(QWidget):
     def __init__(self, controller):
@@ -1360,6 +3569,12 @@ class AssignReturnPage(QWidget):
         header_layout.addWidget(title)
         header_layout.addStretch()
 
+        batch_btn = QPushButton("Batch Mode")
+        batch_btn.setFixedWidth(180)
+        batch_btn.setMinimumHeight(50)
+        batch_btn.clicked.connect(self.show_batch_form)
+        header_layout.addWidget(batch_btn)
+
         refresh_btn = QPushButton("Refresh")
         refresh_btn.setObjectName("refreshButton")
         refresh_btn.setFixedWidth(180)
@@ -1399,13 +3614,14 @@ class AssignReturnPage(QWidget):
             }
         """
 
-        self.user_dropdown = QComboBox()
+        runner = self.controller.runner
+        self.user_dropdown = LookupComboBox(runner, "users", "name")
         self.user_dropdown.setMinimumHeight(50)
         self.user_dropdown.setStyleSheet(combo_style)
         self.user_dropdown.setPlaceholderText("Select user...")
         assign_layout.addWidget(self.user_dropdown)
 
-        self.book_dropdown = QComboBox()
+        self.book_dropdown = LookupComboBox(runner, "books", "title", "current_user_id IS NULL")
         self.book_dropdown.setMinimumHeight(50)
         self.book_dropdown.setStyleSheet(combo_style)
         self.book_dropdown.setPlaceholderText("Select book...")
@@ -1435,11 +3651,11 @@ class AssignReturnPage(QWidget):
         return_title.setStyleSheet("color: #1f2937; border: none;")
         return_layout.addWidget(return_title)
 
-        self.return_user_dropdown = QComboBox()
+        self.return_user_dropdown = LookupComboBox(runner, "users", "name")
         self.return_user_dropdown.setMinimumHeight(50)
         self.return_user_dropdown.setStyleSheet(combo_style)
         self.return_user_dropdown.setPlaceholderText("Select user...")
-        self.return_user_dropdown.currentTextChanged.connect(self.update_return_books)
+        self.return_user_dropdown.chosen.connect(self.update_return_books)
         return_layout.addWidget(self.return_user_dropdown)
 
         self.return_book_dropdown = QComboBox()
@@ -1463,165 +3679,235 @@ class AssignReturnPage(QWidget):
         layout.addLayout(split_layout)
         layout.addStretch()
 
-        self.refresh()
-
     def refresh(self):
-        self.populate_dropdowns()
-        self.update_return_books()
-        self.user_dropdown.setCurrentIndex(-1)
-        self.book_dropdown.setCurrentIndex(-1)
-        self.return_user_dropdown.setCurrentIndex(-1)
-        self.return_book_dropdown.setCurrentIndex(-1)
         self.issue_date.setDate(QDate.currentDate())
         self.return_date.setDate(QDate.currentDate())
-
-    def populate_dropdowns(self):
-        try:
-            cursor = self.controller.db.cursor()
-            # Load users
-            cursor.execute("SELECT name FROM users")
-            users = [row[0] for row in cursor.fetchall()]
-            # Load available books (not currently issued)
-            cursor.execute("""
-                SELECT b.title 
-                FROM books b
-                LEFT JOIN transactions t ON b.id = t.book_id AND t.return_date IS NULL
-                WHERE t.id IS NULL
-            """)
-            books = [row[0] for row in cursor.fetchall()]
-            cursor.close()
-
-            self.user_dropdown.clear()
-            self.return_user_dropdown.clear()
-            self.book_dropdown.clear()
-            if users:
-                self.user_dropdown.addItems(users)
-                self.return_user_dropdown.addItems(users)
-            else:
-                self.user_dropdown.addItem("No users found")
-                self.return_user_dropdown.addItem("No users found")
-                QMessageBox.warning(self, "Warning", "No users found in the database.")
-
-            if books:
-                self.book_dropdown.addItems(books)
-            else:
-                self.book_dropdown.addItem("No books available")
-                QMessageBox.warning(self, "Warning", "No available books found in the database.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to populate dropdowns: {e}")
+        # The pickers load their rows when they are opened or typed into
+        self.user_dropdown.reload()
+        self.book_dropdown.reload()
+        self.return_user_dropdown.reload()
+        self.update_return_books()
 
     def update_return_books(self):
-        try:
-            user_name = self.return_user_dropdown.currentText().strip()
-            self.return_book_dropdown.clear()
-
-            if not user_name or user_name == "No users found":
-                self.return_book_dropdown.addItem("No books available")
-                return
-
-            cursor = self.controller.db.cursor()
-            cursor.execute("""
-                SELECT b.title 
-                FROM books b
-                JOIN transactions t ON b.id = t.book_id
-                JOIN users u ON t.user_id = u.id
-                WHERE u.name = %s AND t.return_date IS NULL
-            """, (user_name,))
-            books = [row[0] for row in cursor.fetchall()]
+        user_id = self.return_user_dropdown.selected_id()
+        user_name = self.return_user_dropdown.currentText().strip()
+        self.return_book_dropdown.clear()
+
+        if user_id is None:
+            self.controller.runner.cancel("return_books")
+            self.return_book_dropdown.addItem("No books available")
+            return
+
+        def fetch_issued_books(conn):
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, title FROM books WHERE current_user_id = %s ORDER BY title", (user_id,))
+            books = cursor.fetchall()
             cursor.close()
+            return books
 
+        def fill_return_books(books):
+            self.return_book_dropdown.clear()
             if books:
-                self.return_book_dropdown.addItems(books)
+                for book_id, title in books:
+                    self.return_book_dropdown.addItem(title, book_id)
             else:
                 self.return_book_dropdown.addItem("No issued books")
                 QMessageBox.warning(self, "Warning", f"No issued books found for user '{user_name}'.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to refresh return books: {e}")
 
-    def assign_book(self):
-        try:
-            user_name = self.user_dropdown.currentText().strip()
-            book_title = self.book_dropdown.currentText().strip()
-            issue_date = self.issue_date.date().toPyDate()
+        self.controller.runner.submit(fetch_issued_books, fill_return_books, "Failed to refresh return books",
+                                      key="return_books")
 
-            if not user_name or not book_title or user_name == "No users found" or book_title == "No books available":
-                QMessageBox.critical(self, "Error", "Please select both a valid user and book")
-                return
+    def assign_book(self):
+        user_id = self.user_dropdown.selected_id()
+        book_id = self.book_dropdown.selected_id()
+        issue_date = self.issue_date.date().toPyDate()
 
-            cursor = self.controller.db.cursor()
-            cursor.execute("SELECT id FROM users WHERE name=%s", (user_name,))
-            user_result = cursor.fetchone()
-            if not user_result:
-                QMessageBox.critical(self, "Error", "User not found")
-                cursor.close()
-                return
-            user_id = user_result[0]
+        if user_id is None or book_id is None:
+            QMessageBox.critical(self, "Error", "Please select both a valid user and book")
+            return
 
-            cursor.execute("SELECT id FROM books WHERE title=%s", (book_title,))
-            book_result = cursor.fetchone()
-            if not book_result:
-                QMessageBox.critical(self, "Error", "Book not found")
-                cursor.close()
-                return
-            book_id = book_result[0]
+        def issue(conn):
+            call_procedure(conn, "issue_book",
+                           (user_id, book_id, issue_date, issue_date + timedelta(days=LOAN_PERIOD_DAYS)))
 
-            cursor.execute("""
-                INSERT INTO transactions (user_id, book_id, issue_date)
-                VALUES (%s, %s, %s)
-            """, (user_id, book_id, issue_date))
-            self.controller.db.commit()
-            cursor.close()
+        def assigned(_):
             QMessageBox.information(self, "Success", "Book assigned")
             self.refresh()
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Error", f"Database error: {err}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to assign book: {e}")
+
+        self.controller.runner.submit(issue, assigned, "Failed to assign book")
 
     def return_book(self):
-        try:
-            user_name = self.return_user_dropdown.currentText().strip()
-            book_title = self.return_book_dropdown.currentText().strip()
-            return_date = self.return_date.date().toPyDate()
+        user_id = self.return_user_dropdown.selected_id()
+        book_id = self.return_book_dropdown.currentData()
+        return_date = self.return_date.date().toPyDate()
 
-            if not user_name or not book_title or user_name == "No users found" or book_title in ["No issued books", "No books available"]:
-                QMessageBox.critical(self, "Error", "Please select both a valid user and book")
-                return
+        if user_id is None or book_id is None:
+            QMessageBox.critical(self, "Error", "Please select both a valid user and book")
+            return
 
-            cursor = self.controller.db.cursor()
-            cursor.execute("SELECT id FROM users WHERE name=%s", (user_name,))
-            user_result = cursor.fetchone()
-            if not user_result:
-                QMessageBox.critical(self, "Error", "User not found")
-                cursor.close()
-                return
-            user_id = user_result[0]
+        def close_loan(conn):
+            call_procedure(conn, "return_book", (user_id, book_id, return_date))
 
-            cursor.execute("SELECT id FROM books WHERE title=%s", (book_title,))
-            book_result = cursor.fetchone()
-            if not book_result:
-                QMessageBox.critical(self, "Error", "Book not found")
-                cursor.close()
+        def returned(_):
+            QMessageBox.information(self, "Success", "Book returned")
+            self.refresh()
+
+        self.controller.runner.submit(close_loan, returned, "Failed to return book")
+
+    def show_batch_form(self):
+        dialog = QDialog(self.controller)
+        dialog.setWindowTitle("Batch Issue / Return")
+        dialog.setFixedSize(700, 850)
+        dialog.setStyleSheet("background-color: #f0f2f5;")
+
+        layout = QVBoxLayout(dialog)
+        frame = QFrame()
+        frame_layout = QVBoxLayout(frame)
+        frame_layout.setSpacing(15)
+        frame_layout.setContentsMargins(30, 30, 30, 30)
+
+        title = QLabel("Batch Issue / Return")
+        title.setFont(QFont("Helvetica, Arial, sans-serif", 24, QFont.Bold))
+        title.setStyleSheet("color: #1f2937; border: none;")
+        frame_layout.addWidget(title)
+
+        mode_layout = QHBoxLayout()
+        return_mode = QRadioButton("Return")
+        return_mode.setChecked(True)
+        mode_layout.addWidget(return_mode)
+        issue_mode = QRadioButton("Issue to member")
+        mode_layout.addWidget(issue_mode)
+        mode_layout.addStretch()
+        frame_layout.addLayout(mode_layout)
+
+        member_serial = QLineEdit()
+        member_serial.setPlaceholderText("Member serial number")
+        member_serial.setMinimumHeight(50)
+        member_serial.setEnabled(False)
+        issue_mode.toggled.connect(member_serial.setEnabled)
+        frame_layout.addWidget(member_serial)
+
+        serials = QTextEdit()
+        serials.setPlaceholderText("Book serial numbers - type, paste or scan, one per line")
+        serials.setMinimumHeight(160)
+        frame_layout.addWidget(serials)
+
+        batch_date = QDateEdit()
+        batch_date.setCalendarPopup(True)
+        batch_date.setDisplayFormat("yyyy-MM-dd")
+        batch_date.setMinimumHeight(50)
+        batch_date.setDate(QDate.currentDate())
+        frame_layout.addWidget(batch_date)
+
+        process_btn = QPushButton("Process Batch")
+        process_btn.setMinimumHeight(50)
+        frame_layout.addWidget(process_btn)
+
+        summary = QLabel("")
+        frame_layout.addWidget(summary)
+
+        results = QTableWidget()
+        results.setColumnCount(3)
+        results.setHorizontalHeaderLabels(['Book Serial', 'Title', 'Result'])
+        results.horizontalHeader().setStretchLastSection(True)
+        results.setAlternatingRowColors(True)
+        results.setEditTriggers(QTableWidget.NoEditTriggers)
+        frame_layout.addWidget(results)
+
+        def show_results(report):
+            results.setRowCount(len(report))
+            for row_idx, item in enumerate(report):
+                for col_idx, value in enumerate(item):
+                    results.setItem(row_idx, col_idx, QTableWidgetItem(value or ''))
+            done = sum(1 for item in report if item[2] in ("Issued", "Returned"))
+            summary.setText(f"{done} of {len(report)} processed, {len(report) - done} failed")
+            process_btn.setEnabled(True)
+            self.refresh()
+
+        def process():
+            book_serials = list(dict.fromkeys(re.split(r"[\s,;]+", serials.toPlainText().strip())))
+            book_serials = [serial for serial in book_serials if serial]
+            if not book_serials:
+                QMessageBox.critical(self, "Error", "Enter at least one book serial number")
+                return
+            issuing = issue_mode.isChecked()
+            if issuing and not member_serial.text().strip():
+                QMessageBox.critical(self, "Error", "Enter the member serial number to issue to")
                 return
-            book_id = book_result[0]
+            member = member_serial.text().strip()
+            on_date = batch_date.date().toPyDate()
+            process_btn.setEnabled(False)
+            self.controller.runner.submit(
+                lambda conn: self.process_batch(conn, issuing, member, book_serials, on_date),
+                show_results, on_error=batch_failed)
 
-            cursor.execute("""
-                UPDATE transactions 
-                SET return_date=%s 
-                WHERE user_id=%s AND book_id=%s AND return_date IS NULL
-            """, (return_date, user_id, book_id))
-            if cursor.rowcount == 0:
-                QMessageBox.critical(self, "Error", "No active transaction found for this book and user")
+        def batch_failed(err):
+            process_btn.setEnabled(True)
+            message = str(err) if isinstance(err, LibraryError) else f"Failed to process batch: {err}"
+            QMessageBox.critical(self, "Error", message)
+
+        process_btn.clicked.connect(process)
+
+        layout.addWidget(frame)
+        dialog.exec_()
+
+    @staticmethod
+    def process_batch(conn, issuing, member_serial, book_serials, on_date):
+        """Validate every serial in one query and apply the whole batch in one transaction.
+
+        Returns a ``(serial, title, result)`` row per serial, in input order.
+        """
+        cursor = conn.cursor()
+        user_id = None
+        if issuing:
+            cursor.execute("SELECT id FROM users WHERE serial_number=%s", (member_serial,))
+            user = cursor.fetchone()
+            if not user:
                 cursor.close()
-                return
-            self.controller.db.commit()
-            cursor.close()
-            QMessageBox.information(self, "Success", "Book returned")
-            self.refresh()
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Error", f"Database error: {err}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to return book: {e}")
+                raise LibraryError(f"No member with serial number '{member_serial}'")
+            user_id = user[0]
+
+        placeholders = ", ".join(["%s"] * len(book_serials))
+        # Lock the copies so a desk working in parallel cannot interleave
+        cursor.execute(f"""
+            SELECT serial_number, id, title, current_user_id FROM books
+            WHERE serial_number IN ({placeholders})
+            FOR UPDATE
+        """, book_serials)
+        books = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        report = []
+        valid = []
+        for serial in book_serials:
+            if serial not in books:
+                report.append((serial, None, "Not found"))
+                continue
+            book_id, title, holder = books[serial]
+            if issuing and holder is not None:
+                report.append((serial, title, "Already issued"))
+            elif not issuing and holder is None:
+                report.append((serial, title, "Not issued"))
+            else:
+                report.append((serial, title, "Issued" if issuing else "Returned"))
+                valid.append(book_id)
+
+        if valid:
+            ids = ", ".join(["%s"] * len(valid))
+            if issuing:
+                due_date = on_date + timedelta(days=LOAN_PERIOD_DAYS)
+                cursor.executemany("""
+                    INSERT INTO transactions (user_id, book_id, issue_date, due_date) VALUES (%s, %s, %s, %s)
+                """, [(user_id, book_id, on_date, due_date) for book_id in valid])
+                cursor.execute(f"UPDATE books SET current_user_id=%s, current_issue_date=%s WHERE id IN ({ids})",
+                               [user_id, on_date] + valid)
+            else:
+                cursor.execute(f"UPDATE transactions SET return_date=%s WHERE return_date IS NULL AND book_id IN ({ids})",
+                               [on_date] + valid)
+                cursor.execute(f"UPDATE books SET current_user_id=NULL, current_issue_date=NULL WHERE id IN ({ids})",
+                               valid)
+        conn.commit()
+        cursor.close()
+        return report
 
 class AdminPanelPage(QWidget):
     def __init__(self, controller):
@@ -1694,52 +3980,53 @@ class AdminPanelPage(QWidget):
         layout.addWidget(frame)
         layout.addStretch()
 
-        self.refresh()
-
     def refresh(self):
         self.refresh_users()
-        self.user_dropdown.setCurrentIndex(-1)
         self.password.clear()
         self.confirm_password.clear()
 
     def refresh_users(self):
-        try:
-            self.user_dropdown.clear()
-            cursor = self.controller.db.cursor()
+        def fetch_members(conn):
+            cursor = conn.cursor()
             cursor.execute("SELECT name FROM users WHERE is_admin=FALSE")
             users = [row[0] for row in cursor.fetchall()]
-            self.user_dropdown.addItems(users)
             cursor.close()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to refresh users: {e}")
+            return users
 
-    def make_admin(self):
-        try:
-            user_name = self.user_dropdown.currentText()
-            password = self.password.text().strip()
-            confirm_password = self.confirm_password.text().strip()
+        def fill_members(users):
+            self.user_dropdown.clear()
+            self.user_dropdown.addItems(users)
+            self.user_dropdown.setCurrentIndex(-1)
 
-            if not user_name:
-                QMessageBox.critical(self, "Error", "Please select a user")
-                return
-            if not password or password != confirm_password:
-                QMessageBox.critical(self, "Error", "Passwords don't match or are empty")
-                return
+        self.controller.runner.submit(fetch_members, fill_members, "Failed to refresh users", key="members")
 
-            cursor = self.controller.db.cursor()
+    def make_admin(self):
+        user_name = self.user_dropdown.currentText()
+        password = self.password.text().strip()
+        confirm_password = self.confirm_password.text().strip()
+
+        if not user_name:
+            QMessageBox.critical(self, "Error", "Please select a user")
+            return
+        if not password or password != confirm_password:
+            QMessageBox.critical(self, "Error", "Passwords don't match or are empty")
+            return
+
+        def grant_admin(conn):
+            cursor = conn.cursor()
             cursor.execute("""
                 UPDATE users 
                 SET is_admin=TRUE, password=%s 
                 WHERE name=%s
             """, (password, user_name))
-            self.controller.db.commit()
+            conn.commit()
             cursor.close()
+
+        def granted(_):
             QMessageBox.information(self, "Success", "Admin privileges granted")
             self.refresh()
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Error", f"Database error: {err}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to grant admin access: {e}")
+
+        self.controller.runner.submit(grant_admin, granted, "Failed to grant admin access")
 
 class ReportPage(QWidget):
     def __init__(self, controller):
@@ -1763,10 +4050,10 @@ class ReportPage(QWidget):
         generate_btn.clicked.connect(self.generate_report)
         header_layout.addWidget(generate_btn)
 
-        export_btn = QPushButton("Export to Excel")
+        export_btn = QPushButton("Export")
         export_btn.setFixedWidth(180)
         export_btn.setMinimumHeight(50)
-        export_btn.clicked.connect(self.export_to_excel)
+        export_btn.clicked.connect(self.export_report)
         header_layout.addWidget(export_btn)
 
         refresh_btn = QPushButton("Refresh")
@@ -1794,96 +4081,326 @@ class ReportPage(QWidget):
         self.transaction_history = QRadioButton("Transaction History")
         options_layout.addWidget(self.transaction_history)
 
-        layout.addWidget(options_frame)
+        self.top_books = QRadioButton("Top Books")
+        options_layout.addWidget(self.top_books)
 
-        # Report output
-        self.report_text = QTextEdit()
-        layout.addWidget(self.report_text)
+        self.loans_per_month = QRadioButton("Loans per Month")
+        options_layout.addWidget(self.loans_per_month)
+
+        self.loan_duration = QRadioButton("Average Loan Duration")
+        options_layout.addWidget(self.loan_duration)
+
+        self.overdue_fines = QRadioButton("Overdue Loans & Fines")
+        options_layout.addWidget(self.overdue_fines)
+
+        self.report_types = [
+            (self.all_books, "all_books"),
+            (self.issued_books, "issued_books"),
+            (self.transaction_history, "transaction_history"),
+            (self.top_books, "top_books"),
+            (self.loans_per_month, "loans_per_month"),
+            (self.loan_duration, "loan_duration"),
+            (self.overdue_fines, "overdue_fines"),
+        ]
 
-        self.refresh()
+        # Report filters, applied in the query itself
+        filters_frame = QFrame()
+        filters_layout = QGridLayout(filters_frame)
+        filters_layout.setSpacing(15)
+        filters_layout.setContentsMargins(30, 30, 30, 30)
+
+        self.date_filter = QCheckBox("Date range")
+        filters_layout.addWidget(self.date_filter, 0, 0)
+        self.date_field = QComboBox()
+        self.date_field.addItem("Issue date", "issue_date")
+        self.date_field.addItem("Return date", "return_date")
+        filters_layout.addWidget(self.date_field, 0, 1)
+        self.date_from = QDateEdit()
+        self.date_from.setCalendarPopup(True)
+        self.date_from.setDisplayFormat("yyyy-MM-dd")
+        filters_layout.addWidget(self.date_from, 0, 2)
+        self.date_to = QDateEdit()
+        self.date_to.setCalendarPopup(True)
+        self.date_to.setDisplayFormat("yyyy-MM-dd")
+        filters_layout.addWidget(self.date_to, 0, 3)
+
+        self.author_filter = QLineEdit()
+        self.author_filter.setPlaceholderText("Author starts with...")
+        filters_layout.addWidget(self.author_filter, 1, 0, 1, 2)
+        self.user_filter = QLineEdit()
+        self.user_filter.setPlaceholderText("Member starts with...")
+        filters_layout.addWidget(self.user_filter, 1, 2, 1, 2)
+
+        self.location_filter = QLineEdit()
+        self.location_filter.setPlaceholderText("Location contains...")
+        filters_layout.addWidget(self.location_filter, 2, 0, 1, 2)
+        self.overdue_filter = QCheckBox("Overdue only")
+        filters_layout.addWidget(self.overdue_filter, 2, 2)
+        self.top_count = QSpinBox()
+        self.top_count.setRange(1, 1000)
+        self.top_count.setPrefix("Top ")
+        filters_layout.addWidget(self.top_count, 2, 3)
+
+        options_row = QHBoxLayout()
+        options_row.setSpacing(30)
+        options_row.addWidget(options_frame)
+        options_row.addWidget(filters_frame, 1)
+        layout.addLayout(options_row)
+
+        # Report output
+        self.report_cache = OrderedDict()  # (report type, filters) -> (data version, frames, rows, truncated)
+        status_layout = QHBoxLayout()
+        self.report_status = QLabel()
+        status_layout.addWidget(self.report_status)
+        status_layout.addStretch()
+
+        self.cancel_export_btn = QPushButton("Cancel Export")
+        self.cancel_export_btn.setFixedWidth(180)
+        self.cancel_export_btn.setVisible(False)
+        self.cancel_export_btn.clicked.connect(self.cancel_export)
+        status_layout.addWidget(self.cancel_export_btn)
+        layout.addLayout(status_layout)
+
+        # Only the rows on screen are ever rendered, however long the report
+        self.report_model = DataFrameModel(self)
+        self.report_view = QTableView()
+        self.report_view.setModel(self.report_model)
+        self.report_view.setSelectionBehavior(QTableView.SelectRows)
+        self.report_view.setWordWrap(False)
+        self.report_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.report_view.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.report_view)
 
     def refresh(self):
-        self.report_text.clear()
+        self.controller.runner.cancel("report")
+        self.report_view.setSortingEnabled(False)
+        self.report_model.clear()
+        self.report_status.clear()
         self.all_books.setChecked(True)
+        self.date_filter.setChecked(False)
+        self.date_field.setCurrentIndex(0)
+        self.date_from.setDate(QDate.currentDate().addMonths(-1))
+        self.date_to.setDate(QDate.currentDate())
+        self.author_filter.clear()
+        self.user_filter.clear()
+        self.location_filter.clear()
+        self.overdue_filter.setChecked(False)
+        self.top_count.setValue(10)
+
+    def report_filters(self):
+        filters = {
+            "author": self.author_filter.text().strip(),
+            "user": self.user_filter.text().strip(),
+            "location": self.location_filter.text().strip(),
+            "overdue": self.overdue_filter.isChecked(),
+            "top": self.top_count.value(),
+        }
+        if self.date_filter.isChecked():
+            filters["date_field"] = self.date_field.currentData()
+            filters["date_from"] = self.date_from.date().toPyDate()
+            filters["date_to"] = self.date_to.date().toPyDate()
+        return filters
 
     def generate_report(self):
-        try:
-            cursor = self.controller.db.cursor(dictionary=True)
-            if self.all_books.isChecked():
-                report_type = "all_books"
-            elif self.issued_books.isChecked():
-                report_type = "issued_books"
+        report_type = next(report for button, report in self.report_types if button.isChecked())
+        filters = self.report_filters()
+
+        self.report_type = None
+        # Rows arriving while sorted would land out of order
+        self.report_view.setSortingEnabled(False)
+        self.report_model.clear()
+        self.report_status.setText("Loading report...")
+        # Only the preview is read here; an export streams the full report
+        query, params = build_report_query(report_type, filters, REPORT_PREVIEW_ROWS + 1)
+        # Overdue status moves with the calendar, so the day is part of the key
+        key = (report_type, tuple(sorted(filters.items())), datetime.now().date())
+        cached = self.report_cache.get(key)
+        frames = []
+
+        def build_report(conn, progress):
+            import pandas as pd
+            # Read first: a write landing after this only costs a rebuild next time
+            version = read_data_version(conn)
+            if cached is not None and cached[0] == version:
+                return version, None
+            refresh_reporting(conn)
+            total, truncated = 0, False
+            for description, rows in stream_query(conn, query, params):
+                shown = rows[:REPORT_PREVIEW_ROWS - total]
+                truncated = len(shown) < len(rows)
+                total += len(shown)
+                columns = [column[0] for column in description]
+                if not progress((pd.DataFrame.from_records(shown, columns=columns), total)):
+                    break
+            return version, (total, truncated)
+
+        def show_rows(chunk):
+            frame, total = chunk
+            frames.append(frame)
+            first = not self.report_model.rows
+            self.report_model.append(frame)
+            if first:
+                self.report_view.resizeColumnsToContents()
+            self.report_status.setText(f"Loaded {total} rows...")
+
+        def show_report(report):
+            version, built = report
+            if built is None:
+                # Nothing was written since the cached run
+                _, cached_frames, total, truncated = cached
+                self.report_cache.move_to_end(key)
+                self.report_model.load(cached_frames)
+                self.report_view.resizeColumnsToContents()
             else:
-                report_type = "transaction_history"
-
-            if report_type == "all_books":
-                query = """
-                    SELECT b.serial_number, b.title, a.name as author, 
-                           u.name as user, COALESCE(u.address, b.location) as location,
-                           t.issue_date, t.return_date
-                    FROM books b
-                    LEFT JOIN authors a ON b.author_id = a.id
-                    LEFT JOIN transactions t ON b.id = t.book_id
-                    LEFT JOIN users u ON t.user_id = u.id
-                    ORDER BY b.title
-                """
-            elif report_type == "issued_books":
-                query = """
-                    SELECT b.serial_number, b.title, a.name as author, 
-                           u.name as user, u.address as location, t.issue_date
-                    FROM books b
-                    JOIN authors a ON b.author_id = a.id
-                    JOIN transactions t ON b.id = t.book_id
-                    JOIN users u ON t.user_id = u.id
-                    WHERE t.return_date IS NULL
-                    ORDER BY t.issue_date
-                """
+                total, truncated = built
+                self.report_cache.pop(key, None)
+                if not truncated and total <= REPORT_CACHE_ROWS:
+                    self.report_cache[key] = (version, frames, total, truncated)
+                    while (len(self.report_cache) > REPORT_CACHE_SIZE
+                           or sum(entry[2] for entry in self.report_cache.values()) > REPORT_CACHE_ROWS):
+                        self.report_cache.popitem(last=False)
+            if not total:
+                self.report_status.setText("No data found for the selected report type.")
+                return
+            self.report_type = report_type
+            self.report_params = filters
+            # Keep the report's own order until a header is clicked
+            self.report_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+            self.report_view.setSortingEnabled(True)
+            if truncated:
+                self.report_status.setText(f"Showing the first {total} rows. Export to get the full report.")
             else:
-                query = """
-                    SELECT b.serial_number, b.title, a.name as author, 
-                           u.name as user, COALESCE(u.address, b.location) as location,
-                           t.issue_date, t.return_date
-                    FROM books b
-                    JOIN authors a ON b.author_id = a.id
-                    JOIN transactions t ON b.id = t.book_id
-                    JOIN users u ON t.user_id = u.id
-                    ORDER BY t.issue_date DESC
-                """
-
-            cursor.execute(query)
-            results = cursor.fetchall()
-            cursor.close()
-
-            if not results:
-                self.report_text.setText("No data found for the selected report type.")
+                self.report_status.setText(f"{total} rows")
+
+        # Reports legitimately run long, so they are exempt from the SELECT timeout
+        self.controller.runner.submit(build_report, show_report, "Failed to generate report", key="report",
+                                      timeout=0, on_progress=show_rows)
+
+    def export_report(self):
+        report_type = getattr(self, "report_type", None)
+        if not report_type:
+            QMessageBox.warning(self, "Warning", "No report data to export. Generate a report first.")
+            return
+        # Export the report as generated, even if the filters were edited since
+        query, params = build_report_query(report_type, self.report_params)
+
+        file_filters = ";;".join(file_filter for file_filter, _, _, _ in REPORT_EXPORT_FORMATS)
+        file_path, chosen_filter = QFileDialog.getSaveFileName(self, "Save report as", "", file_filters)
+        if not file_path:
+            return
+        for file_filter, extension, module, writer_class in REPORT_EXPORT_FORMATS:
+            if file_path.lower().endswith(extension):
+                break
+        else:
+            file_filter, extension, module, writer_class = next(
+                entry for entry in REPORT_EXPORT_FORMATS if entry[0] == chosen_filter)
+            file_path += extension
+        if module and importlib.util.find_spec(module) is None:
+            QMessageBox.critical(self, "Error",
+                                 f"Export engine '{module}' not installed. Please install it using 'pip install {module}'.")
+            return
+
+        def export(conn, progress):
+            refresh_reporting(conn)
+            writer, total, finished = None, 0, False
+            try:
+                for description, rows in stream_query(conn, query, params):
+                    if writer is None:
+                        writer = writer_class(file_path, description)
+                    writer.write(rows)
+                    total += len(rows)
+                    if not progress(total):
+                        break
+                else:
+                    finished = True
+            finally:
+                if writer is not None:
+                    writer.close()
+                # A cancelled or failed export leaves no half-written file behind
+                if not finished and os.path.exists(file_path):
+                    os.remove(file_path)
+            return total
+
+        def exported(total):
+            self.cancel_export_btn.setVisible(False)
+            if not total:
+                self.report_status.setText("No data found for the selected report type.")
                 return
+            self.report_status.setText(f"Exported {total} rows")
+            QMessageBox.information(self, "Success", f"Report successfully exported to {file_path}")
 
-            self.report_df = pd.DataFrame(results)
-            self.report_text.setText(self.report_df.to_string(index=False))
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to generate report: {e}")
+        def export_failed(err):
+            self.cancel_export_btn.setVisible(False)
+            self.report_status.clear()
+            QMessageBox.critical(self, "Error", f"Failed to export report: {err}")
 
-    def export_to_excel(self):
-        try:
-            if not hasattr(self, 'report_df') or self.report_df.empty:
-                QMessageBox.warning(self, "Warning", "No report data to export. Generate a report first.")
-                return
+        self.report_status.setText("Exporting report...")
+        self.cancel_export_btn.setVisible(True)
+        self.controller.runner.submit(export, exported, key="report_export", on_error=export_failed, timeout=0,
+                                      on_progress=lambda total: self.report_status.setText(f"Exported {total} rows..."))
 
-            file_path = QFileDialog.getSaveFileName(self, "Save report as", "", "Excel files (*.xlsx);;All files (*.*)")[0]
-            if file_path:
-                if not file_path.endswith('.xlsx'):
-                    file_path += '.xlsx'
-                self.report_df.to_excel(file_path, index=False, engine='openpyxl')
-                QMessageBox.information(self, "Success", f"Report successfully exported to {file_path}")
-        except ImportError:
-            QMessageBox.critical(self, "Error",
-                                 "Excel export engine 'openpyxl' not installed. Please install it using 'pip install openpyxl'.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to export report: {e}")
+    def cancel_export(self):
+        # The worker stops at its next chunk and removes the partial file
+        self.controller.runner.cancel("report_export")
+        self.cancel_export_btn.setVisible(False)
+        self.report_status.setText("Export cancelled")
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="CBCA Library Management System")
+    parser.add_argument("--check-indexes", action="store_true",
+                        help="EXPLAIN the hot queries, report whether they use their indexes and exit")
+    parser.add_argument("--provision", action="store_true",
+                        help="create or migrate the database schema, seed the admin account and exit")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each startup step took once the database is ready, then exit")
+    args, qt_args = parser.parse_known_args()
+
+    if args.check_indexes:
+        pool = ConnectionPool(DB_CONFIG, size=1)
+        with pool.connection() as conn:
+            print("\n".join(check_query_plans(conn)))
+        pool.close()
+        sys.exit(0)
+
+    if args.provision:
+        pool = ConnectionPool(DB_CONFIG, size=1)
+        with pool.connection() as conn:
+            # Migrations and the schema lock wait can outlast the SELECT timeout
+            ConnectionPool.set_query_timeout(conn, 0)
+            applied = provision_schema(conn)
+        pool.close()
+        for version, description in applied:
+            print(f"Applied migration {version}: {description}")
+        print(f"Schema is at version {SCHEMA_VERSION}")
+        sys.exit(0)
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setStyle('Fusion')
+    STARTUP_MARKS.append(("create QApplication", time.perf_counter()))
     window = LibraryManagementSystem()
+    STARTUP_MARKS.append(("build main window", time.perf_counter()))
     window.show()
+    # Fires on the event loop's first pass, after the window's first paint
+    QTimer.singleShot(0, lambda: STARTUP_MARKS.append(("show login window", time.perf_counter())))
+
+    if args.profile_startup:
+        def print_startup_profile():
+            if not window.database_ready:
+                return
+            timer.stop()
+            # The database connects alongside the GUI steps, so steps are listed in the order they finished
+            start = previous = STARTUP_MARKS[0][1]
+            print(f"{'step':<32}{'took':>10}{'done at':>12}")
+            for step, finished in sorted(STARTUP_MARKS[1:], key=lambda mark: mark[1]):
+                print(f"{step:<32}{(finished - previous) * 1000:7.1f} ms{(finished - start) * 1000:9.1f} ms")
+                previous = finished
+            total = (dict(STARTUP_MARKS)["show login window"] - start) * 1000
+            verdict = "within" if total <= STARTUP_BUDGET_MS else "OVER"
+            print(f"Login window after {total:.1f} ms, {verdict} the {STARTUP_BUDGET_MS} ms budget")
+            app.quit()
+
+        timer = QTimer()
+        timer.timeout.connect(print_startup_profile)
+        timer.start(50)
+
     sys.exit(app.exec_())
\ No newline at end of file